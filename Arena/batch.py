@@ -0,0 +1,445 @@
+# Python 3.6
+
+from hlt import constants
+
+import argparse
+import time
+
+import numpy as np
+
+from Arena.sim import CONSTANTS, INITIAL_ENERGY, generate_map, max_turns
+from Overmind.assign import hungarian, peaks, top_columns
+from Overmind.distance import DistanceTable
+from Overmind.ga_param import Params
+from Overmind.window import window_sum
+
+# most ship slots per player, fleets are capped at this size
+SLOTS = 64
+
+# Gatherer.py's fixed spawning rules and target scoring in policy terms
+GATHERER = {"dscale": 3, "target_size": 1, "build_until": 150, "max_ships": 15}
+
+# window radius Overmind's assign_targets scores its candidates with
+ASSIGN_RADIUS = 2
+
+# ship states, same meaning as Overmind.roles.gatherer.state
+GATHER = 0
+RETURN = 1
+SEEK = 2
+
+# (dy, dx) for north, south, east, west and staying still
+MOVES = np.array([[-1, 0], [1, 0], [0, 1], [0, -1], [0, 0]])
+STILL = 4
+
+# =============================================================================
+def params_policy(params):
+    # policy dict for an Overmind.ga_param.Params style object
+    return {
+        "assign": True,
+        "dscale": params.DSCALE,
+        "target_size": params.TARGET_SIZE,
+        "build_freeze": params.BUILD_FREEZE,
+        "max_ships_x": params.MAX_SHIPS_X,
+        "max_ships_y": params.MAX_SHIPS_Y,
+    }
+
+# =============================================================================
+# BatchMatch - many independent games stepped together as stacked arrays
+#
+# state is held as (game, ...) arrays: halite (G, H, W), ships (G, P, S)
+# with S the largest fleet any policy allows.
+# the bots' python objects can't be batched, so every player runs a vectorized
+# model of the gatherer state machine both bots share (seek a target, gather
+# greedily, return when full, collapse at the end). every ship without a
+# target is given one, whatever its state, the way both strategies do it.
+# what the targets are and the spawning are set by the player's policy:
+#
+#   assign                        - Overmind's assign_targets: peaks of the
+#                                   radius 2 window, scaled by the distance
+#                                   from each ship and matched to distinct
+#                                   ships. otherwise Gatherer's get_targets
+#   dscale                        - distance falloff of the target scores
+#   target_size                   - get_targets window radius
+#   build_until, max_ships        - spawning limits, or
+#   build_freeze, max_ships_x/_y  - the same limits in ga_param.Params terms
+#
+# ships move navigate style and give way to each other, planned paths and
+# defending the shipyard are left out, so the scores are for ranking policies
+# against each other rather than predicting real games.
+#
+# policy values may be scalars or one value per game, so a whole population
+# of parameter vectors can be scored in one batch
+# =============================================================================
+class BatchMatch:
+    def __init__(self, seeds, policies, size=32, turns=None):
+        self.seeds = list(seeds)
+        self.size = size
+        self.turns = turns or max_turns(size)
+
+        constants.load_constants(dict(CONSTANTS, MAX_TURNS=self.turns))
+
+        G = len(self.seeds)
+        P = len(policies)
+        maps = [generate_map(size, P, np.random.RandomState(seed)) for seed in self.seeds]
+        self.halite = np.stack([m[0] for m in maps]).astype(np.int64)
+        yards = np.array([m[1] for m in maps])
+        self.yard_x = yards[:, :, 0]
+        self.yard_y = yards[:, :, 1]
+
+        # owner of the structure on every cell, -1 for none
+        self.structure = np.full(self.halite.shape, -1, dtype=np.int64)
+        for p in range(P):
+            self.structure[np.arange(G), self.yard_y[:, p], self.yard_x[:, p]] = p
+
+        self.dist = DistanceTable(size, size)
+        self._resolve(policies)
+
+        # get_targets distance falloff from each player's shipyard, (G, P, H*W)
+        cells = np.arange(size)
+        home = self.dist.manhattan_table[(cells[:, None] - self.yard_y[:, :, None, None]) % size, (cells[None, :] - self.yard_x[:, :, None, None]) % size]
+        self._falloff = (1 + (home / self.dist.max_dist) * (self.dscale[:, :, None, None] - 1)).reshape(G, P, -1)
+
+        shape = (G, P, max(int(self.max_ships.max()), 1))
+        self.alive = np.zeros(shape, dtype=bool)
+        self.x = np.zeros(shape, dtype=np.int64)
+        self.y = np.zeros(shape, dtype=np.int64)
+        self.cargo = np.zeros(shape, dtype=np.int64)
+        self.state = np.full(shape, SEEK, dtype=np.int8)
+        self.has_target = np.zeros(shape, dtype=bool)
+        self.tx = np.zeros(shape, dtype=np.int64)
+        self.ty = np.zeros(shape, dtype=np.int64)
+
+        self.bank = np.full((G, P), INITIAL_ENERGY, dtype=np.int64)
+        self.stop_spawning = np.zeros((G, P), dtype=bool)
+
+        # broadcastable game and player indices
+        self._g = np.arange(G)[:, None, None]
+        self._p = np.arange(P)[None, :, None]
+
+    def _resolve(self, policies):
+        G = len(self.seeds)
+        P = len(policies)
+        total = self.halite.reshape(G, -1).sum(axis=1)
+
+        def column(policy, key):
+            return np.broadcast_to(np.asarray(policy[key]), (G,))
+
+        self.assign = np.zeros((G, P), dtype=bool)
+        self.dscale = np.zeros((G, P))
+        self.radius = np.zeros((G, P), dtype=np.int64)
+        self.build_until = np.zeros((G, P), dtype=np.int64)
+        self.max_ships = np.zeros((G, P), dtype=np.int64)
+        for p, policy in enumerate(policies):
+            self.assign[:, p] = column(policy, "assign") if "assign" in policy else False
+            self.dscale[:, p] = column(policy, "dscale")
+            self.radius[:, p] = column(policy, "target_size")
+            if "build_until" in policy:
+                self.build_until[:, p] = column(policy, "build_until")
+                self.max_ships[:, p] = column(policy, "max_ships")
+            else:
+                # same formulas as Overmind's strategy and calc_max_ships
+                self.build_until[:, p] = self.turns - column(policy, "build_freeze")
+                self.max_ships[:, p] = (column(policy, "max_ships_x") * self.size + (column(policy, "max_ships_y") / total) / P).astype(np.int64)
+        np.minimum(self.max_ships, SLOTS, out=self.max_ships)
+
+    def run(self):
+        curves = np.zeros((self.turns,) + self.bank.shape, dtype=np.int64)
+        for turn in range(1, self.turns + 1):
+            self.step(turn)
+            curves[turn - 1] = self.bank
+
+        return {
+            "seeds": self.seeds,
+            "size": self.size,
+            "turns": self.turns,
+            "halite": self.bank.copy(),
+            "ships": self.alive.sum(axis=2),
+            "curves": curves,
+        }
+
+    # -------------------------------------------------------------------------
+    def _toward(self, tx, ty):
+        # navigate style directions toward (tx, ty): the larger axis first and
+        # the other axis as the fallback, STILL where there is none
+        half = self.size // 2
+        dx = ((tx - self.x + half) % self.size) - half
+        dy = ((ty - self.y + half) % self.size) - half
+
+        along_x = np.where(dx > 0, 2, 3)
+        along_y = np.where(dy > 0, 1, 0)
+        use_x = np.abs(dx) >= np.abs(dy)
+        move = np.where(use_x, along_x, along_y)
+        alt = np.where(use_x, along_y, along_x)
+        move[(dx == 0) & (dy == 0)] = STILL
+        alt[(dx == 0) | (dy == 0)] = STILL
+        return move, alt
+
+    def _assign_targets(self, need):
+        # only players with a ship waiting for a target are scored
+        games, players = np.nonzero(need.any(axis=2))
+        matched = self.assign[games, players]
+        if (~matched).any():
+            self._yard_targets(need, games[~matched], players[~matched])
+        if matched.any():
+            self._matched_targets(need, games[matched], players[matched])
+        self.has_target |= need
+
+    def _yard_targets(self, need, games, players):
+        # the best get_targets cells per player, handed out in slot order
+        S = need.shape[2]
+        W = self.size
+
+        values = np.zeros((len(games), W * W))
+        for r in np.unique(self.radius[games, players]):
+            rows = np.nonzero(self.radius[games, players] == r)[0]
+            values[rows] = window_sum(self.halite[games[rows]], int(r)).reshape(len(rows), -1)
+        scores = values / self._falloff[games, players]
+
+        top = np.argpartition(-scores, S - 1, axis=1)[:, :S]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+        cells = np.take_along_axis(top, order, axis=1)
+
+        rank = np.cumsum(need[games, players], axis=1) - 1
+        picked = np.take_along_axis(cells, np.clip(rank, 0, S - 1), axis=1)
+        mask = need[games, players]
+        slots = np.nonzero(mask)
+        self.tx[games[slots[0]], players[slots[0]], slots[1]] = picked[mask] % W
+        self.ty[games[slots[0]], players[slots[0]], slots[1]] = picked[mask] // W
+
+    def _matched_targets(self, need, games, players):
+        # assign_targets for every player: the ships x peaks matrix scored by
+        # the distance from each ship, solved one player at a time
+        W = self.size
+        table = self.dist.manhattan_table
+        boards, board = np.unique(games, return_inverse=True)
+        sums = window_sum(self.halite[boards], ASSIGN_RADIUS)
+
+        for g, p, b in zip(games.tolist(), players.tolist(), board.tolist()):
+            slots = np.nonzero(need[g, p])[0]
+            values = sums[b].ravel()
+            cells = peaks(sums[b])
+            if len(cells) < len(slots):
+                cells = np.arange(W * W)
+
+            sx = self.x[g, p, slots]
+            sy = self.y[g, p, slots]
+            def score(cells):
+                dist = table[(cells[None, :] // W - sy[:, None]) % W, (cells[None, :] % W - sx[:, None]) % W]
+                return values[cells][None, :] / (1 + (dist / self.dist.max_dist) * (self.dscale[g, p] - 1))
+
+            cells = cells[top_columns(score(cells), len(slots))]
+            picked = cells[hungarian(score(cells))]
+            self.tx[g, p, slots] = picked % W
+            self.ty[g, p, slots] = picked // W
+
+    def _enemies(self):
+        # (G, P, H, W) count of every other player's ships on each cell
+        G, P, _ = self.alive.shape
+        g = np.broadcast_to(self._g, self.x.shape)[self.alive]
+        p = np.broadcast_to(self._p, self.x.shape)[self.alive]
+        own = np.zeros((G, P, self.size, self.size), dtype=np.int32)
+        np.add.at(own, (g, p, self.y[self.alive], self.x[self.alive]), 1)
+        return own.sum(axis=1, keepdims=True) - own
+
+    def _inspired(self):
+        # ships with at least two enemy ships within the inspiration radius.
+        # the diamond is summed as rows of shrinking width, each row read off
+        # a wrap padded prefix sum at the cells the ships are on
+        r = constants.INSPIRATION_RADIUS
+        others = self._enemies()
+
+        padded = np.concatenate((others[..., -r:], others, others[..., :r]), axis=-1)
+        prefix = np.zeros(padded.shape[:-1] + (padded.shape[-1] + 1,), dtype=np.int32)
+        np.cumsum(padded, axis=-1, out=prefix[..., 1:])
+
+        enemies = np.zeros(self.x.shape, dtype=np.int32)
+        for dy in range(-r, r + 1):
+            width = r - abs(dy)
+            y = (self.y + dy) % self.size
+            enemies += prefix[self._g, self._p, y, self.x + r + width + 1] - prefix[self._g, self._p, y, self.x + r - width]
+
+        return enemies >= constants.INSPIRATION_SHIP_COUNT
+
+    def step(self, turn):
+        G, P, S = self.alive.shape
+        alive = self.alive
+        cur = self.halite[self._g, self.y, self.x]
+        cost = cur // constants.MOVE_COST_RATIO
+        full = self.cargo >= constants.MAX_HALITE
+
+        home = self.dist.manhattan_table[(self.y - self.yard_y[:, :, None]) % self.size, (self.x - self.yard_x[:, :, None]) % self.size]
+        at_home = home == 0
+        collapse = alive & (turn >= self.turns - home - (4 + (self.size - 32) / 2))
+
+        # state transitions, in the order gatherer.update applies them
+        returned = alive & (self.state == RETURN) & at_home
+        self.state[returned] = SEEK
+
+        need = alive & ~self.has_target
+        if need.any():
+            self._assign_targets(need)
+
+        arrived = alive & (self.state == SEEK) & self.has_target & (self.x == self.tx) & (self.y == self.ty)
+        self.state[arrived] = GATHER
+        self.has_target &= ~arrived
+        self.state[alive & full & (self.state != RETURN)] = RETURN
+
+        # every ship's move and, when it goes somewhere, a fallback move
+        move = np.full(self.x.shape, STILL, dtype=np.int64)
+        alt = np.full(self.x.shape, STILL, dtype=np.int64)
+
+        # seekers head for their target unless staying is worth more
+        seek = alive & (self.state == SEEK) & (cost <= self.cargo) & ~(cur * 0.25 > self.cargo / 2)
+        seek_move, seek_alt = self._toward(self.tx, self.ty)
+        move[seek] = seek_move[seek]
+        alt[seek] = seek_alt[seek]
+
+        # gatherers step to the richest neighbour when it beats staying
+        gather = alive & (self.state == GATHER)
+        neighbours = np.stack([self.halite[self._g, (self.y + dy) % self.size, (self.x + dx) % self.size] for dy, dx in MOVES[:4]], axis=-1)
+        best = np.argmax(neighbours, axis=-1)
+        best_value = np.max(neighbours, axis=-1)
+        step_out = gather & (cost <= self.cargo) & (best_value * 0.25 > cur * 0.25 + 3 * cost * 1.0)
+        move[step_out] = best[step_out]
+
+        # returners go home once the cell is poor or they are full
+        ret = alive & (self.state == RETURN) & ((cur < constants.MAX_HALITE / 10) | full)
+        home_move, home_alt = self._toward(self.yard_x[:, :, None], self.yard_y[:, :, None])
+        going = ret | (collapse & ~at_home)
+        move[going] = home_move[going]
+        alt[going] = home_alt[going]
+        move[collapse & at_home] = STILL
+        alt[collapse & at_home] = STILL
+
+        # ships that can't pay for the move stay and mine, and like navigate
+        # nobody steps onto an enemy ship
+        move[(move != STILL) & (cost > self.cargo)] = STILL
+        move[~alive] = STILL
+        alt[move == STILL] = STILL
+        enemies = self._enemies()
+        for m in (alt, move):
+            ny = (self.y + MOVES[m][..., 0]) % self.size
+            nx = (self.x + MOVES[m][..., 1]) % self.size
+            m[(m != STILL) & (enemies[self._g, self._p, ny, nx] > 0)] = STILL
+        move[move == STILL] = alt[move == STILL]
+        alt[move == alt] = STILL
+
+        self._avoid_own_collisions(move, alt, collapse)
+
+        # spawning, checked against the board before anything moves
+        yard_busy = np.zeros((G, P), dtype=bool)
+        for p in range(P):
+            yard_busy[:, p] = (alive & (self.x == self.yard_x[:, p, None, None]) & (self.y == self.yard_y[:, p, None, None])).any(axis=(1, 2))
+        want = (turn <= self.build_until) & (self.bank >= constants.SHIP_COST) & ~yard_busy & (alive.sum(axis=2) < self.max_ships) & ~self.stop_spawning
+        enough = self.halite.reshape(G, -1).sum(axis=1)[:, None] > 50000
+        self.stop_spawning |= want & ~enough
+        spawn = want & enough & ~alive.all(axis=2)
+
+        # movement
+        moving = alive & (move != STILL)
+        self.cargo[moving] -= cost[moving]
+        self.x = (self.x + MOVES[move][..., 1]) % self.size
+        self.y = (self.y + MOVES[move][..., 0]) % self.size
+
+        spawned = np.zeros(alive.shape, dtype=bool)
+        if spawn.any():
+            games, players = np.nonzero(spawn)
+            slots = np.argmin(alive[games, players], axis=1)
+            spawned[games, players, slots] = True
+            alive[spawned] = True
+            self.x[games, players, slots] = self.yard_x[games, players]
+            self.y[games, players, slots] = self.yard_y[games, players]
+            self.cargo[spawned] = 0
+            self.state[spawned] = SEEK
+            self.has_target[spawned] = False
+            self.bank[spawn] -= constants.SHIP_COST
+
+        # collisions between any ships, cargo dropped or banked by the structure owner
+        g = np.broadcast_to(self._g, alive.shape)
+        count = np.zeros(self.halite.shape, dtype=np.int64)
+        np.add.at(count, (g[alive], self.y[alive], self.x[alive]), 1)
+        dead = alive & (count[g, self.y, self.x] > 1)
+        if dead.any():
+            owner = self.structure[g, self.y, self.x]
+            on_cell = dead & (owner < 0)
+            np.add.at(self.halite, (g[on_cell], self.y[on_cell], self.x[on_cell]), self.cargo[on_cell])
+            banked = dead & (owner >= 0)
+            np.add.at(self.bank, (g[banked], owner[banked]), self.cargo[banked])
+            alive[dead] = False
+            self.cargo[dead] = 0
+            self.has_target[dead] = False
+
+        # mining for ships that stayed put
+        mining = alive & ~moving & ~spawned
+        if mining.any():
+            cur = self.halite[self._g, self.y, self.x]
+            extracted = np.minimum(-(-cur // constants.EXTRACT_RATIO), constants.MAX_HALITE - self.cargo)
+            extracted[~mining] = 0
+            self.cargo += extracted
+            np.subtract.at(self.halite, (g[mining], self.y[mining], self.x[mining]), extracted[mining])
+
+            bonus = np.minimum((extracted * constants.INSPIRED_BONUS_MULTIPLIER).astype(np.int64), constants.MAX_HALITE - self.cargo)
+            bonus[~(mining & self._inspired())] = 0
+            self.cargo += bonus
+
+        # deposits at our own shipyard
+        p = np.broadcast_to(self._p, alive.shape)
+        deposit = alive & (self.structure[g, self.y, self.x] == p)
+        np.add.at(self.bank, (g[deposit], p[deposit]), self.cargo[deposit])
+        self.cargo[deposit] = 0
+
+    def _avoid_own_collisions(self, move, alt, collapse):
+        # a moving ship gives way when its destination is already claimed by a
+        # team mate, staying ships first, then ships leaving the shipyard so
+        # the ones coming in can drop off. a ship that gives way takes its
+        # fallback move if it has one, else stays. collapsing ships may crash
+        # at home. every round changes at least one move, so this ends
+        G, P, S = move.shape
+        on_yard = (self.x == self.yard_x[:, :, None]) & (self.y == self.yard_y[:, :, None])
+        while True:
+            ny = (self.y + MOVES[move][..., 0]) % self.size
+            nx = (self.x + MOVES[move][..., 1]) % self.size
+            key = ((self._g * P + self._p) * self.size + ny) * self.size + nx
+            crash = collapse & (nx == self.yard_x[:, :, None]) & (ny == self.yard_y[:, :, None])
+
+            claim = self.alive & ~crash
+            keys = key[claim]
+            movers = (move != STILL)[claim]
+            order = np.lexsort((~on_yard[claim], movers, keys))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = keys[order][1:] != keys[order][:-1]
+
+            blocked = np.zeros(len(order), dtype=bool)
+            blocked[order] = ~first & movers[order]
+            if not blocked.any():
+                break
+
+            stay = np.zeros(move.shape, dtype=bool)
+            stay[claim] = blocked
+            move[stay] = alt[stay]
+            alt[stay] = STILL
+
+# =============================================================================
+def evaluate(params, seeds, size=32, n_players=2, opponent=GATHERER):
+    # final halite of an Overmind style policy against copies of the opponent
+    policies = [params_policy(params)] + [opponent] * (n_players - 1)
+    return BatchMatch(seeds, policies, size).run()["halite"]
+
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Score ga_param.Params over many seeds at once")
+    parser.add_argument("--games", type=int, default=64)
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--players", type=int, default=2, choices=(2, 4))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    halite = evaluate(Params, range(args.games), args.size, args.players)
+    elapsed = time.perf_counter() - start
+
+    wins = (halite[:, 0] >= halite.max(axis=1)).mean()
+    print("{} games of {}x{} in {:.2f}s".format(args.games, args.size, args.size, elapsed))
+    print("mean halite {:.0f} vs {:.0f}, win rate {:.2f}".format(halite[:, 0].mean(), halite[:, 1:].mean(), wins))
+
+if __name__ == "__main__":
+    main()
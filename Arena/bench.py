@@ -0,0 +1,222 @@
+# Python 3.6
+
+import hlt
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from Arena.sim import Match, SimGame
+from Overmind.budget import TurnBudget
+from Overmind.ga_param import Params as GAP
+from Overmind.grid import HaliteGrid
+from Overmind.resolve import resolve
+from Overmind.roles import gatherer
+import Overmind.strategy as STRAT
+import Overmind.tools as tools
+
+SIZES = [32, 40, 48, 56, 64]
+FLEETS = [4, 16, 50, 100, 150]
+TARGET_SIZES = [1, 3, 6, 9]
+
+# a case is flagged when its median gets this much slower than the baseline
+THRESHOLD = 1.25
+
+# timings only compare on one machine, so the baseline is made locally: run
+#   python -m Arena.bench --out bench-baseline.json
+# before a change, then compare with --baseline bench-baseline.json
+BASELINE = "bench-baseline.json"
+
+# =============================================================================
+# scenario - a mid game board with n of our ships and a quarter as many
+# enemies on random free cells, wrapped as the bot would see it
+# =============================================================================
+def scenario(size, n_ships, seed=0):
+    match = Match(["Overmind", "Gatherer"], size, seed)
+    rng = np.random.RandomState(seed)
+
+    free = [i for i in range(size * size) if (i % size, i // size) not in match.structures]
+    cells = rng.choice(free, n_ships + n_ships // 4, replace=False)
+    for n, cell in enumerate(cells):
+        owner = 0 if n < n_ships else 1
+        match.ships[n] = [owner, int(cell % size), int(cell // size), int(rng.randint(0, 500))]
+    match._next_id = len(cells)
+    match.turn = 50
+
+    # same order as the bot: grid built from the initial map, then a frame
+    game = SimGame(match, 0)
+    grid = HaliteGrid(game)
+    game.update_frame()
+    grid.update(game)
+    return game, grid
+
+# =============================================================================
+def measure(fn, setup=None, min_time=0.1, min_runs=3, max_runs=1000):
+    # time fn alone, calling setup for fresh arguments before every run
+    times = []
+    while len(times) < max_runs and (len(times) < min_runs or sum(times) < min_time):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+
+    return {"median": float(np.median(times)), "min": float(min(times)), "runs": len(times)}
+
+# =============================================================================
+def _next_frame(game, grid):
+    # window sums and the threat map are cached per frame, update the grid
+    # before every run so each one starts on a fresh frame
+    def setup():
+        grid.update(game)
+        return ()
+    return setup
+
+def _wall(game, cells):
+    # occupy cells with a stand in ship so the path has to go around them
+    blocker = game.me.get_ships()[0]
+    for x, y in cells:
+        game.game_map[hlt.Position(x, y)].ship = blocker
+
+def _clear(game, cells):
+    for x, y in cells:
+        game.game_map[hlt.Position(x, y)].ship = None
+
+def _free_cell(game, x, y):
+    # nearest cell at or after (x, y) along the row that has no ship on it
+    w = game.game_map.width
+    while game.game_map[hlt.Position(x, y)].is_occupied:
+        x += 1
+    return hlt.Position(x % w, y % w)
+
+# =============================================================================
+def cases(size, n_ships):
+    game, grid = scenario(size, n_ships)
+    ships = game.me.get_ships()
+    yard = game.me.shipyard.position
+    label = "{}x{} {} ships".format(size, size, n_ships)
+
+    yield "get_total_halite " + label, lambda: tools.get_total_halite(grid), None
+
+    original = GAP.TARGET_SIZE
+    for radius in TARGET_SIZES:
+        def targets(radius=radius):
+            GAP.TARGET_SIZE = radius
+            tools.get_targets(game, grid, n_ships)
+        yield "get_targets[TARGET_SIZE={}] {}".format(radius, label), targets, _next_frame(game, grid)
+    GAP.TARGET_SIZE = original
+
+    for seekless in sorted({1, max(n_ships // 4, 1), n_ships}):
+        gs = [gatherer(s.id) for s in ships[:seekless]]
+        yield "assign_targets[seekless={}] {}".format(seekless, label), lambda gs=gs: tools.assign_targets(game, grid, gs), _next_frame(game, grid)
+
+    # paths: a few steps, across half the map, around a wall and to a walled in cell
+    start = _free_cell(game, yard.x + 1, yard.y)
+    short = _free_cell(game, start.x + 2, start.y + 1)
+    far = _free_cell(game, start.x + size // 2, start.y + size // 2 - 1)
+    yield "get_path[short] " + label, lambda: tools.get_path(game, grid, start, short), None
+    yield "get_path[long] " + label, lambda: tools.get_path(game, grid, start, far), None
+
+    goal = _free_cell(game, start.x, start.y + 6)
+    wall = [(goal.x + dx, goal.y - 3) for dx in range(-6, 7)]
+    def blocked():
+        _wall(game, wall)
+        try:
+            tools.get_path(game, grid, start, goal)
+        finally:
+            _clear(game, wall)
+    yield "get_path[blocked] " + label, blocked, None
+
+    ring = [(goal.x + 1, goal.y), (goal.x - 1, goal.y), (goal.x, goal.y + 1), (goal.x, goal.y - 1)]
+    def unreachable():
+        _wall(game, ring)
+        try:
+            tools.get_path(game, grid, start, goal)
+        finally:
+            _clear(game, ring)
+    yield "get_path[unreachable] " + label, unreachable, None
+
+    me = game.me.id
+    yield "get_closest_ship " + label, lambda: tools.get_closest_ship(grid, yard, owner=me), None
+    yield "ships.nearest[k=5] " + label, lambda: grid.ships.nearest(yard, 5, owner=me), None
+    yield "ships.within[r=4] " + label, lambda: grid.ships.within(yard, 4), None
+    ys, xs = np.nonzero(grid.occupied)
+    owners = grid.owner[ys, xs]
+    ids = grid.ship_at[ys, xs]
+    yield "ships.build " + label, lambda: grid.ships.build(owners, ids, xs, ys), None
+    yield "threat.update " + label, lambda: grid.threat, _next_frame(game, grid)
+
+    # a whole turn where every ship still needs a target, the expensive case
+    def turn_setup():
+        game, grid = scenario(size, n_ships)
+        return STRAT.gather_passive(game, grid), game, grid
+    yield "gather_passive.update " + label, lambda strategy, game, grid: strategy.update(game, grid, TurnBudget(), []), turn_setup
+
+    # the final pass over that turn's commands
+    def resolve_setup():
+        strategy, game, grid = turn_setup()
+        command_queue = []
+        strategy.update(game, grid, TurnBudget(), command_queue)
+        return game, command_queue, strategy.may_crash, strategy.goal
+    yield "resolve " + label, resolve, resolve_setup
+
+# =============================================================================
+def run(sizes, fleets, pattern=None):
+    results = {}
+    for size in sizes:
+        for n_ships in fleets:
+            for name, fn, setup in cases(size, n_ships):
+                if pattern and pattern not in name:
+                    continue
+                results[name] = measure(fn, setup)
+                print("{:<55} {:>10.3f} ms".format(name, 1000 * results[name]["median"]))
+    return results
+
+# =============================================================================
+def compare(results, baseline, threshold=THRESHOLD):
+    # (name, baseline median, new median, ratio) for every case in both runs
+    rows = []
+    for name, result in results.items():
+        if name in baseline:
+            before = baseline[name]["median"]
+            rows.append((name, before, result["median"], result["median"] / before if before else float("inf")))
+    regressions = [row for row in rows if row[3] > threshold]
+    return rows, regressions
+
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Overmind hot paths on synthetic maps")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--ships", type=int, nargs="+", default=FLEETS)
+    parser.add_argument("--filter", default=None, help="only run cases whose name contains this")
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--baseline", default=None, help="earlier --out file to compare against, e.g. " + BASELINE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.ships, args.filter)
+    with open(args.out, "w") as f:
+        json.dump({
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "results": results,
+        }, f, indent=1)
+    print("{} cases written to {}".format(len(results), args.out))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        rows, regressions = compare(results, baseline, args.threshold)
+        for name, before, after, ratio in rows:
+            flag = "  REGRESSION" if ratio > args.threshold else ""
+            print("{:<55} {:>9.3f} -> {:>9.3f} ms  x{:.2f}{}".format(name, 1000 * before, 1000 * after, ratio, flag))
+        if regressions:
+            print("{} of {} cases slower than x{:.2f}".format(len(regressions), len(rows), args.threshold))
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
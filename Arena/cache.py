@@ -0,0 +1,113 @@
+# Python 3.6
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# source files behind each bot, relative to the repo root. FUBot and Gatherer
+# borrow Overmind modules so a change there has to invalidate their results too
+SOURCES = {
+    "Overmind": ["Overmind", "Overmind.py"],
+    "FUBot": ["FUBot", "FUBot.py", "Overmind"],
+    "Gatherer": ["Gatherer.py", "Overmind"],
+}
+
+# the match rules, part of every key
+RULES = ["Arena/sim.py"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_digests = {}
+
+# =============================================================================
+def source_hash(paths):
+    # sha256 over the contents of every .py file under paths, memoized per
+    # process since the sources don't change under a running tuner
+    key = tuple(paths)
+    if key in _digests:
+        return _digests[key]
+
+    files = []
+    for path in paths:
+        full = os.path.join(ROOT, path)
+        if os.path.isdir(full):
+            for dirpath, _, names in os.walk(full):
+                files.extend(os.path.join(dirpath, n) for n in names if n.endswith(".py"))
+        elif os.path.exists(full):
+            files.append(full)
+
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(os.path.relpath(name, ROOT).encode())
+        with open(name, "rb") as f:
+            digest.update(f.read())
+
+    _digests[key] = digest.hexdigest()
+    return _digests[key]
+
+# =============================================================================
+# ResultCache - content addressed store of match results in sqlite
+#
+# a key is the hash of the bot sources, the match rules, the bots in seat
+# order, the parameter vector, the seed, the map size and the turn count.
+# editing any bot or the simulator changes the key, so stale results are
+# never hit and simply stop being read. results are stored whole, including
+# the per turn halite curves and latencies
+# =============================================================================
+class ResultCache:
+    def __init__(self, path="arena-cache.sqlite"):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        self.db = sqlite3.connect(path, timeout=60)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " bots TEXT,"
+            " size INTEGER,"
+            " seed INTEGER,"
+            " params TEXT,"
+            " created REAL,"
+            " result TEXT)"
+        )
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    # -------------------------------------------------------------------------
+    def key(self, bots, size, seed, params=None, turns=None):
+        names = sorted(set(bots))
+        record = {
+            "sources": {name: source_hash(SOURCES.get(name, [name])) for name in names},
+            "rules": source_hash(RULES),
+            "bots": list(bots),
+            "params": params,
+            "seed": seed,
+            "size": size,
+            "turns": turns,
+        }
+        return hashlib.sha256(json.dumps(record, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        row = self.db.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, result, params=None):
+        self.db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, json.dumps(result["bots"]), result["size"], result["seed"], json.dumps(params), time.time(), json.dumps(result)),
+        )
+        self.db.commit()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
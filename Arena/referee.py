@@ -0,0 +1,249 @@
+# Python 3.6
+
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from Arena.sim import CONSTANTS, Match
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# entry points, launched the way the engine launches them
+SCRIPTS = {
+    "Overmind": "Overmind.py",
+    "FUBot": "FUBot.py",
+    "Gatherer": "Gatherer.py",
+}
+
+# the engine's limits, in seconds
+TURN_LIMIT = 2.0
+INIT_LIMIT = 30.0
+
+# =============================================================================
+# _BotProcess - one bot on the other end of a pair of pipes
+#
+# a reader thread timestamps every line the moment it arrives, so the
+# recorded latency is when the bot answered, not when we got around to
+# looking
+# =============================================================================
+class _BotProcess:
+    def __init__(self, name, player_id, python, log_dir):
+        self.name = name
+        self.id = player_id
+        self.lines = queue.Queue()
+        self.eliminated = None
+
+        self.stderr = open(os.path.join(log_dir, "{}-{}.stderr".format(player_id, name)), "wb")
+        self.started = time.perf_counter()
+        self.proc = subprocess.Popen(
+            [python, os.path.join(ROOT, SCRIPTS[name])],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self.stderr, cwd=log_dir,
+        )
+
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def _read(self):
+        for line in self.proc.stdout:
+            self.lines.put((time.perf_counter(), line.decode().strip()))
+        self.lines.put((time.perf_counter(), None))
+
+    @property
+    def alive(self):
+        return self.eliminated is None
+
+    def send(self, data):
+        try:
+            self.proc.stdin.write(data)
+            self.proc.stdin.flush()
+            return True
+        except (BrokenPipeError, OSError):
+            return False
+
+    def receive(self, deadline):
+        # the next line or None if it doesn't arrive before the deadline
+        try:
+            arrived, line = self.lines.get(timeout=max(0, deadline - time.perf_counter()))
+        except queue.Empty:
+            return None, None
+        return arrived, line
+
+    def stop(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.stderr.close()
+
+# =============================================================================
+# Referee - a match between bot subprocesses over the engine's stdio protocol
+#
+# the game rules and state come from Arena.sim.Match, only the transport is
+# different: every frame is written to each bot's stdin and the commands are
+# read back from its stdout. a bot that exits, or misses the init or turn
+# deadline, is killed and eliminated; its ships sit still for the rest of
+# the game. eliminated bots rank below the survivors, later eliminations
+# first, then by halite as the engine does
+# =============================================================================
+class Referee:
+    def __init__(self, bots, size=32, seed=0, turns=None, turn_limit=TURN_LIMIT, init_limit=INIT_LIMIT, python=sys.executable, log_dir="arena-logs"):
+        self.match = Match(bots, size, seed, turns)
+        self.bot_names = list(bots)
+        self.turn_limit = turn_limit
+        self.init_limit = init_limit
+        self.python = python
+        self.log_dir = log_dir
+
+    # -------------------------------------------------------------------------
+    def init_frame(self, player_id):
+        match = self.match
+        lines = [
+            json.dumps(dict(CONSTANTS, MAX_TURNS=match.turns)),
+            "{} {}".format(len(match.players), player_id),
+        ]
+        for p in match.players:
+            lines.append("{} {} {}".format(p.id, p.shipyard[0], p.shipyard[1]))
+        lines.append("{} {}".format(match.size, match.size))
+        for row in match.halite:
+            lines.append(" ".join(str(int(h)) for h in row))
+        return ("\n".join(lines) + "\n").encode()
+
+    def turn_frame(self):
+        match = self.match
+        lines = [str(match.turn)]
+        for p in match.players:
+            ships = [(id, s) for id, s in match.ships.items() if s[0] == p.id]
+            lines.append("{} {} {} {}".format(p.id, len(ships), len(p.dropoffs), p.halite))
+            for id, (_, x, y, cargo) in ships:
+                lines.append("{} {} {} {}".format(id, x, y, cargo))
+            for id, (x, y) in p.dropoffs.items():
+                lines.append("{} {} {}".format(id, x, y))
+        lines.append(str(len(match.changes)))
+        for x, y, h in match.changes:
+            lines.append("{} {} {}".format(x, y, h))
+        return ("\n".join(lines) + "\n").encode()
+
+    # -------------------------------------------------------------------------
+    def run(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        match = self.match
+        bots = [_BotProcess(name, p.id, self.python, self.log_dir) for name, p in zip(self.bot_names, match.players)]
+
+        init_latency = [None for _ in bots]
+        latency = [[] for _ in bots]
+        curves = [[] for _ in bots]
+
+        try:
+            for bot in bots:
+                bot.send(self.init_frame(bot.id))
+            for bot in bots:
+                arrived, name = bot.receive(bot.started + self.init_limit)
+                if name is None:
+                    self._eliminate(bot, 0)
+                else:
+                    init_latency[bot.id] = arrived - bot.started
+
+            for turn in range(1, match.turns + 1):
+                match.turn = turn
+                frame = self.turn_frame()
+
+                sent = time.perf_counter()
+                for bot in bots:
+                    if bot.alive and not bot.send(frame):
+                        self._eliminate(bot, turn)
+
+                commands = {}
+                for bot in bots:
+                    commands[bot.id] = []
+                    if not bot.alive:
+                        continue
+                    arrived, line = bot.receive(sent + self.turn_limit)
+                    if line is None:
+                        self._eliminate(bot, turn)
+                        continue
+                    latency[bot.id].append(arrived - sent)
+                    commands[bot.id] = self._parse(line)
+
+                match.step(commands)
+                for p in match.players:
+                    curves[p.id].append(p.halite)
+        finally:
+            for bot in bots:
+                bot.stop()
+
+        halite = [p.halite for p in match.players]
+        eliminated = [bot.eliminated for bot in bots]
+        survived = match.turns + 1
+        rank = sorted(range(len(bots)), key=lambda i: (-(eliminated[i] if eliminated[i] is not None else survived), -halite[i]))
+        return {
+            "bots": self.bot_names,
+            "seed": match.seed,
+            "size": match.size,
+            "turns": match.turns,
+            "halite": halite,
+            "ships": [sum(1 for s in match.ships.values() if s[0] == p.id) for p in match.players],
+            "rank": rank,
+            "winner": rank[0],
+            "curves": curves,
+            "latency": latency,
+            "init_latency": init_latency,
+            "eliminated": eliminated,
+            "errors": [0 if e is None else 1 for e in eliminated],
+        }
+
+    @staticmethod
+    def _parse(line):
+        # "m 3 n g c 7" -> ["m 3 n", "g", "c 7"]
+        words = line.split()
+        commands = []
+        i = 0
+        while i < len(words):
+            width = {"m": 3, "c": 2}.get(words[i], 1)
+            commands.append(" ".join(words[i:i + width]))
+            i += width
+        return commands
+
+    def _eliminate(self, bot, turn):
+        bot.eliminated = turn
+        bot.proc.kill()
+
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Run a match between bot subprocesses over the engine protocol")
+    parser.add_argument("bots", nargs="+", choices=sorted(SCRIPTS))
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--turns", type=int, default=None)
+    parser.add_argument("--turn-limit", type=float, default=TURN_LIMIT)
+    parser.add_argument("--init-limit", type=float, default=INIT_LIMIT)
+    parser.add_argument("--python", default=sys.executable, help="interpreter the bots are launched with")
+    parser.add_argument("--logs", default="arena-logs", help="working directory for the bots' logs")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = Referee(args.bots, args.size, args.seed, args.turns, args.turn_limit, args.init_limit, args.python, args.logs).run()
+    elapsed = time.perf_counter() - start
+
+    for i, name in enumerate(result["bots"]):
+        turns = np.array(result["latency"][i]) if result["latency"][i] else np.zeros(1)
+        init = result["init_latency"][i]
+        out = " eliminated on turn {}".format(result["eliminated"][i]) if result["eliminated"][i] is not None else ""
+        print("{} {:<10} halite {:>7} ships {:>3}  init {:>7} p50 {:>6.1f}ms p99 {:>6.1f}ms max {:>6.1f}ms{}".format(
+            i, name, result["halite"][i], result["ships"][i], "-" if init is None else "{:.0f}ms".format(1000 * init),
+            1000 * np.percentile(turns, 50), 1000 * np.percentile(turns, 99), 1000 * turns.max(), out))
+    print("winner: {} ({} turns in {:.2f}s)".format(result["bots"][result["winner"]], result["turns"], elapsed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+# Python 3.6
+
+import hlt
+
+from hlt import constants
+from hlt.entity import Dropoff, Ship, Shipyard
+from hlt.game_map import GameMap, MapCell
+from hlt.player import Player
+from hlt.positionals import Position
+
+import argparse
+import importlib
+import logging
+import random
+import time
+
+import numpy as np
+
+# engine constants, MAX_TURNS is filled in from the map size
+CONSTANTS = {
+    "NEW_ENTITY_ENERGY_COST": 1000,
+    "DROPOFF_COST": 4000,
+    "MAX_ENERGY": 1000,
+    "MAX_TURNS": 400,
+    "EXTRACT_RATIO": 4,
+    "MOVE_COST_RATIO": 10,
+    "INSPIRATION_ENABLED": True,
+    "INSPIRATION_RADIUS": 4,
+    "INSPIRATION_SHIP_COUNT": 2,
+    "INSPIRED_EXTRACT_RATIO": 4,
+    "INSPIRED_BONUS_MULTIPLIER": 2.0,
+    "INSPIRED_MOVE_COST_RATIO": 10,
+}
+MAX_TURNS = {32: 400, 40: 425, 48: 450, 56: 475, 64: 500}
+INITIAL_ENERGY = 5000
+
+# bots that can be driven in process, name -> module with a director class
+BOTS = {
+    "Overmind": "Overmind.director",
+    "FUBot": "FUBot.director",
+    "Gatherer": "Gatherer",
+}
+
+DIRECTIONS = {"n": (0, -1), "s": (0, 1), "e": (1, 0), "w": (-1, 0), "o": (0, 0)}
+
+# =============================================================================
+def load_bot(name):
+    return importlib.import_module(BOTS[name]).director
+
+# =============================================================================
+def max_turns(size):
+    return MAX_TURNS.get(size, 300 + (25 * size) // 8)
+
+# =============================================================================
+# generate_map - symmetric halite map and shipyard positions for a seed
+#
+# a quarter (4p) or half (2p) tile of layered value noise is mirrored so every
+# player starts with the same surroundings
+# =============================================================================
+def generate_map(size, n_players, rng):
+    tile_h = size if n_players == 2 else size // 2
+    tile_w = size // 2
+
+    noise = np.zeros((tile_h, tile_w))
+    weight = 1.0
+    for cells in (2, 4, 8, 16):
+        coarse = rng.rand(-(-tile_h * cells // size), -(-tile_w * cells // size))
+        block = -(-size // cells)
+        noise += weight * np.kron(coarse, np.ones((block, block)))[:tile_h, :tile_w]
+        weight /= 2
+
+    noise = (noise - noise.min()) / max(noise.max() - noise.min(), 1e-9)
+    noise = noise ** 3
+    mean = rng.uniform(100, 250)
+    tile = np.clip(noise * (mean / max(noise.mean(), 1e-9)), 0, constants.MAX_HALITE).astype(np.int64)
+
+    sx, sy = tile_w // 2, tile_h // 2
+    tile[sy, sx] = 0
+
+    halite = np.hstack([tile, tile[:, ::-1]])
+    shipyards = [(sx, sy), (size - 1 - sx, sy)]
+    if n_players == 4:
+        halite = np.vstack([halite, halite[::-1, :]])
+        shipyards += [(sx, size - 1 - sy), (size - 1 - sx, size - 1 - sy)]
+
+    return halite, shipyards
+
+# =============================================================================
+class _PlayerState:
+    def __init__(self, id, shipyard):
+        self.id = id
+        self.shipyard = shipyard
+        self.halite = INITIAL_ENERGY
+        self.dropoffs = {}
+
+# =============================================================================
+# SimGame - stand-in for hlt.Game, filled from a Match instead of stdin
+#
+# each bot gets its own view so marking cells unsafe can't leak between bots
+# =============================================================================
+class SimGame(hlt.Game):
+    def __init__(self, match, player_id):
+        self.match = match
+        self.turn_number = 0
+        self.my_id = player_id
+
+        self.players = {}
+        for p in match.players:
+            self.players[p.id] = Player(p.id, Shipyard(p.id, -1, Position(*p.shipyard)), p.halite)
+        self.me = self.players[player_id]
+
+        cells = [[MapCell(Position(x, y), int(match.halite[y, x])) for x in range(match.size)] for y in range(match.size)]
+        self.game_map = GameMap(cells, match.size, match.size)
+        self.game_map.frame_updates = None
+        self._mark()
+
+    def ready(self, name):
+        self.name = name
+
+    def update_frame(self):
+        match = self.match
+        self.turn_number = match.turn
+
+        for p in match.players:
+            player = self.players[p.id]
+            player.halite_amount = p.halite
+            player._ships = {}
+            player._dropoffs = {id: Dropoff(p.id, id, Position(x, y)) for id, (x, y) in p.dropoffs.items()}
+        for id, (owner, x, y, cargo) in match.ships.items():
+            self.players[owner]._ships[id] = Ship(owner, id, Position(x, y), cargo)
+
+        cells = self.game_map._cells
+        for row in cells:
+            for cell in row:
+                cell.ship = None
+        for x, y, h in match.changes:
+            cells[y][x].halite_amount = h
+        self.game_map.frame_updates = list(match.changes)
+
+        self._mark()
+
+    def _mark(self):
+        for player in self.players.values():
+            for ship in player.get_ships():
+                self.game_map[ship.position].mark_unsafe(ship)
+
+            self.game_map[player.shipyard.position].structure = player.shipyard
+            for dropoff in player.get_dropoffs():
+                self.game_map[dropoff.position].structure = dropoff
+
+# =============================================================================
+# Match - headless game between in process bots
+#
+# implements the rules the bots rely on: 25% mining (rounded up), 10% move
+# cost, inspiration, spawning, dropoff construction, collisions (cargo is
+# dropped on the cell, or banked if the cell is a structure) and deposits.
+# everything is driven by the seed, including the bots' use of random
+# =============================================================================
+class Match:
+    def __init__(self, bots, size=32, seed=0, turns=None):
+        self.bot_names = list(bots)
+        self.size = size
+        self.seed = seed
+        self.turns = turns or max_turns(size)
+        self.turn = 0
+
+        constants.load_constants(dict(CONSTANTS, MAX_TURNS=self.turns))
+
+        rng = np.random.RandomState(seed)
+        self.halite, shipyards = generate_map(size, len(bots), rng)
+        self.players = [_PlayerState(i, shipyards[i]) for i in range(len(bots))]
+        self.ships = {}
+        self.changes = []
+        self._next_id = 0
+
+        # (x, y) -> owner for every shipyard and dropoff
+        self.structures = {p.shipyard: p.id for p in self.players}
+
+    def run(self):
+        random.seed(self.seed)
+
+        views = [SimGame(self, p.id) for p in self.players]
+        bots = []
+        for name, view in zip(self.bot_names, views):
+            bot = load_bot(name)(view) if isinstance(name, str) else name(view)
+            bots.append(bot)
+
+        curves = [[] for _ in self.players]
+        latency = [[] for _ in self.players]
+        errors = [0 for _ in self.players]
+
+        for turn in range(1, self.turns + 1):
+            self.turn = turn
+            commands = {}
+            for p, bot, view in zip(self.players, bots, views):
+                view.update_frame()
+                start = time.perf_counter()
+                try:
+                    commands[p.id] = bot.update(view)
+                except Exception:
+                    logging.exception("Player {} failed on turn {}".format(p.id, turn))
+                    errors[p.id] += 1
+                    commands[p.id] = []
+                latency[p.id].append(time.perf_counter() - start)
+
+            self.step(commands)
+            for p in self.players:
+                curves[p.id].append(p.halite)
+
+        halite = [p.halite for p in self.players]
+        rank = sorted(range(len(halite)), key=lambda i: -halite[i])
+        return {
+            "bots": [n if isinstance(n, str) else getattr(n, "__module__", "bot") for n in self.bot_names],
+            "seed": self.seed,
+            "size": self.size,
+            "turns": self.turns,
+            "halite": halite,
+            "ships": [sum(1 for s in self.ships.values() if s[0] == p.id) for p in self.players],
+            "rank": rank,
+            "winner": rank[0],
+            "curves": curves,
+            "latency": latency,
+            "errors": errors,
+        }
+
+    def step(self, commands):
+        before = self.halite.copy()
+        size = self.size
+
+        moves = {}
+        spawns = []
+        constructs = []
+        for pid, cmds in commands.items():
+            for cmd in cmds:
+                parts = cmd.split()
+                if parts[0] == "g":
+                    spawns.append(pid)
+                elif parts[0] == "c" and len(parts) == 2:
+                    constructs.append((pid, int(parts[1])))
+                elif parts[0] == "m" and len(parts) == 3 and parts[2] in DIRECTIONS:
+                    moves[int(parts[1])] = (pid, DIRECTIONS[parts[2]])
+
+        # dropoffs
+        for pid, sid in constructs:
+            ship = self.ships.get(sid)
+            if ship is None or ship[0] != pid or (ship[1], ship[2]) in self.structures:
+                continue
+            player = self.players[pid]
+            cost = constants.DROPOFF_COST - ship[3] - int(self.halite[ship[2], ship[1]])
+            if player.halite >= cost:
+                player.halite -= max(cost, 0)
+                self.halite[ship[2], ship[1]] = 0
+                player.dropoffs[sid] = (ship[1], ship[2])
+                self.structures[(ship[1], ship[2])] = pid
+                del self.ships[sid]
+
+        # spawns land on the shipyard and take part in collisions
+        spawned = set()
+        for pid in set(spawns):
+            player = self.players[pid]
+            if player.halite >= constants.SHIP_COST:
+                player.halite -= constants.SHIP_COST
+                self.ships[self._next_id] = [pid, player.shipyard[0], player.shipyard[1], 0]
+                spawned.add(self._next_id)
+                self._next_id += 1
+
+        # movement, paying for the cell being left
+        moved = set()
+        for sid, (pid, (dx, dy)) in moves.items():
+            ship = self.ships.get(sid)
+            if ship is None or ship[0] != pid or (dx, dy) == (0, 0):
+                continue
+            cost = int(self.halite[ship[2], ship[1]]) // constants.MOVE_COST_RATIO
+            if ship[3] >= cost:
+                ship[3] -= cost
+                ship[1] = (ship[1] + dx) % size
+                ship[2] = (ship[2] + dy) % size
+                moved.add(sid)
+
+        # collisions
+        cells = {}
+        for sid, ship in self.ships.items():
+            cells.setdefault((ship[1], ship[2]), []).append(sid)
+        for (x, y), sids in cells.items():
+            if len(sids) < 2:
+                continue
+            cargo = sum(self.ships[sid][3] for sid in sids)
+            if (x, y) in self.structures:
+                self.players[self.structures[(x, y)]].halite += cargo
+            else:
+                self.halite[y, x] += cargo
+            for sid in sids:
+                del self.ships[sid]
+
+        # mining for ships that stayed put
+        inspired = self._inspired()
+        for sid, ship in self.ships.items():
+            if sid in moved or sid in spawned:
+                continue
+            x, y = ship[1], ship[2]
+            extracted = min(-(-int(self.halite[y, x]) // constants.EXTRACT_RATIO), constants.MAX_HALITE - ship[3])
+            ship[3] += extracted
+            self.halite[y, x] -= extracted
+            if sid in inspired:
+                ship[3] += min(int(extracted * constants.INSPIRED_BONUS_MULTIPLIER), constants.MAX_HALITE - ship[3])
+
+        # deposits
+        for ship in self.ships.values():
+            if self.structures.get((ship[1], ship[2])) == ship[0]:
+                self.players[ship[0]].halite += ship[3]
+                ship[3] = 0
+
+        ys, xs = np.nonzero(self.halite != before)
+        self.changes = [(int(x), int(y), int(self.halite[y, x])) for x, y in zip(xs, ys)]
+
+    def _inspired(self):
+        # ids of ships with enough enemy ships within the inspiration radius
+        if not constants.INSPIRATION_ENABLED or not self.ships:
+            return set()
+
+        ids = list(self.ships)
+        ships = np.array([self.ships[i] for i in ids])
+        dx = np.abs(ships[:, None, 1] - ships[None, :, 1])
+        dy = np.abs(ships[:, None, 2] - ships[None, :, 2])
+        dist = np.minimum(dx, self.size - dx) + np.minimum(dy, self.size - dy)
+        enemies = (dist <= constants.INSPIRATION_RADIUS) & (ships[:, None, 0] != ships[None, :, 0])
+        count = enemies.sum(axis=1)
+
+        return {ids[i] for i in np.flatnonzero(count >= constants.INSPIRATION_SHIP_COUNT)}
+
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Run a headless match between in process bots")
+    parser.add_argument("bots", nargs="+", choices=sorted(BOTS))
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--turns", type=int, default=None)
+    args = parser.parse_args()
+
+    # the bots log to the root logger, only let their errors through
+    logging.basicConfig(level=logging.ERROR)
+    logging.disable(logging.WARNING)
+
+    start = time.perf_counter()
+    result = Match(args.bots, args.size, args.seed, args.turns).run()
+    elapsed = time.perf_counter() - start
+
+    for i, name in enumerate(result["bots"]):
+        print("{} {:<10} halite {:>7} ships {:>3}".format(i, name, result["halite"][i], result["ships"][i]))
+    print("winner: {} ({} turns in {:.2f}s)".format(result["bots"][result["winner"]], result["turns"], elapsed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# Python 3.6
+
+import argparse
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import time
+
+import numpy as np
+
+from Arena.cache import ResultCache
+from Arena.sim import BOTS, Match
+
+# =============================================================================
+def wilson(wins, games, z=1.96):
+    # 95% wilson score interval for a win rate
+    if games == 0:
+        return 0.0, 1.0
+
+    p = wins / games
+    denom = 1 + z*z / games
+    centre = (p + z*z / (2*games)) / denom
+    half = z * math.sqrt(p*(1 - p) / games + z*z / (4*games*games)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+# =============================================================================
+def lineups(bots, n_players):
+    # every seating for 2p, every rotation of the bots cycled to 4 seats for 4p
+    if n_players == 2:
+        return [list(pair) for pair in itertools.permutations(bots, 2)]
+
+    seats = list(itertools.islice(itertools.cycle(bots), 4))
+    return [seats[i:] + seats[:i] for i in range(4)]
+
+# =============================================================================
+def schedule(bots, sizes, player_counts, seeds):
+    games = []
+    for size in sizes:
+        for n_players in player_counts:
+            for lineup in lineups(bots, n_players):
+                for seed in seeds:
+                    games.append((lineup, size, seed))
+    return games
+
+# =============================================================================
+def _init_worker():
+    logging.disable(logging.CRITICAL)
+
+def _play(task):
+    bots, size, seed = task
+    return Match(bots, size, seed).run()
+
+# =============================================================================
+# summarize - per bot win rates, halite curves and turn latency
+#
+# a bot seated twice in a 4p game counts the game once and wins it when
+# either seat wins. curves are the mean banked halite per turn for each
+# (size, players) bracket, latency percentiles are over every turn played
+# =============================================================================
+def summarize(results):
+    bots = sorted({name for r in results for name in r["bots"]})
+    summary = {}
+
+    for name in bots:
+        games = [r for r in results if name in r["bots"]]
+        wins = sum(1 for r in games if r["bots"][r["winner"]] == name)
+        low, high = wilson(wins, len(games))
+
+        latency = np.array([t for r in games for seat, bot in enumerate(r["bots"]) if bot == name for t in r["latency"][seat]])
+        brackets = {}
+        for r in games:
+            bracket = "{}x{} {}p".format(r["size"], r["size"], len(r["bots"]))
+            brackets.setdefault(bracket, []).extend(r["curves"][seat] for seat, bot in enumerate(r["bots"]) if bot == name)
+
+        summary[name] = {
+            "games": len(games),
+            "wins": wins,
+            "win_rate": wins / len(games) if games else 0.0,
+            "win_ci": [low, high],
+            "errors": sum(r["errors"][seat] for r in games for seat, bot in enumerate(r["bots"]) if bot == name),
+            "latency": {
+                "p50": float(np.percentile(latency, 50)) if len(latency) else 0.0,
+                "p99": float(np.percentile(latency, 99)) if len(latency) else 0.0,
+                "max": float(latency.max()) if len(latency) else 0.0,
+            },
+            "curves": {bracket: np.mean(curves, axis=0).round(1).tolist() for bracket, curves in sorted(brackets.items())},
+        }
+
+    return summary
+
+# =============================================================================
+def run(games, workers=None, cache=None):
+    results = [None] * len(games)
+    keys = [None] * len(games)
+    if cache is not None:
+        for i, (bots, size, seed) in enumerate(games):
+            keys[i] = cache.key(bots, size, seed)
+            results[i] = cache.get(keys[i])
+
+    todo = [i for i, result in enumerate(results) if result is None]
+    with multiprocessing.Pool(workers or multiprocessing.cpu_count(), initializer=_init_worker) as pool:
+        for n, (i, result) in enumerate(zip(todo, pool.imap(_play, [games[i] for i in todo]))):
+            results[i] = result
+            if cache is not None:
+                cache.put(keys[i], result)
+            logging.info("{}/{} {} on {}x{} seed {}: {} wins".format(
+                n + 1, len(todo), " ".join(result["bots"]), result["size"], result["size"], result["seed"], result["bots"][result["winner"]]))
+
+    return results
+
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Play the bots against each other over a sweep of maps")
+    parser.add_argument("--bots", nargs="+", default=sorted(BOTS), choices=sorted(BOTS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[32, 40, 48, 56, 64])
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 4], choices=(2, 4))
+    parser.add_argument("--seeds", type=int, default=4, help="maps per size, player count and seating")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default="arena-cache.sqlite", help="match result cache, empty to disable. cached games keep the latencies they were played with")
+    parser.add_argument("--out", default="tournament.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    games = schedule(args.bots, args.sizes, args.players, range(args.seeds))
+    cache = ResultCache(args.cache) if args.cache else None
+
+    start = time.perf_counter()
+    results = run(games, args.workers, cache)
+    summary = summarize(results)
+    elapsed = time.perf_counter() - start
+
+    with open(args.out, "w") as f:
+        json.dump({"games": len(results), "summary": summary}, f, indent=1)
+
+    print("{} games in {:.1f}s, details in {}".format(len(results), elapsed, args.out))
+    print("{:<10} {:>6} {:>8} {:>15} {:>9} {:>9} {:>9} {:>7}".format("bot", "games", "win", "95% ci", "p50 ms", "p99 ms", "max ms", "errors"))
+    for name, s in sorted(summary.items(), key=lambda item: -item[1]["win_rate"]):
+        print("{:<10} {:>6} {:>8.3f} {:>7.3f}-{:<7.3f} {:>9.1f} {:>9.1f} {:>9.1f} {:>7}".format(
+            name, s["games"], s["win_rate"], s["win_ci"][0], s["win_ci"][1],
+            1000 * s["latency"]["p50"], 1000 * s["latency"]["p99"], 1000 * s["latency"]["max"], s["errors"]))
+
+if __name__ == "__main__":
+    main()
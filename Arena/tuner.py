@@ -0,0 +1,304 @@
+# Python 3.6
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+import types
+
+import numpy as np
+
+from Arena.batch import GATHERER, BatchMatch, params_policy
+from Arena.cache import ResultCache
+from Arena.sim import Match
+from Overmind.ga_param import Params
+
+# gene -> (low, high, type). the search space for Overmind.ga_param.Params
+GENES = {
+    "DSCALE": (1, 48, int),
+    "TARGET_SIZE": (0, 10, int),
+    "BUILD_FREEZE": (100, 350, int),
+    "MAX_SHIPS_X": (0.1, 2.0, float),
+    "MAX_SHIPS_Y": (0, 2000000, int),
+}
+
+# share of a gene's range used as the mutation standard deviation
+MUTATION_SCALE = 0.15
+
+# opponents Arena.batch has a policy for
+BATCH_POLICIES = {"Gatherer": GATHERER}
+
+# =============================================================================
+def current_genome():
+    return {name: getattr(Params, name) for name in GENES}
+
+# =============================================================================
+def clamp(name, value):
+    low, high, kind = GENES[name]
+    value = min(max(value, low), high)
+    return int(round(value)) if kind is int else float(value)
+
+# =============================================================================
+def random_genome(rng):
+    return {name: clamp(name, rng.uniform(low, high)) for name, (low, high, _) in GENES.items()}
+
+# =============================================================================
+def crossover(a, b, rng):
+    return {name: a[name] if rng.random() < 0.5 else b[name] for name in GENES}
+
+# =============================================================================
+def mutate(genome, rng, rate):
+    child = dict(genome)
+    for name, (low, high, _) in GENES.items():
+        if rng.random() < rate:
+            child[name] = clamp(name, child[name] + rng.gauss(0, MUTATION_SCALE * (high - low)))
+    return child
+
+# =============================================================================
+# scenarios - the matches every genome is scored on
+#
+# the same seeds are used for every genome and generation so that fitness
+# differences come from the parameters, not the maps
+# =============================================================================
+def scenarios(opponents, sizes, player_counts, seeds):
+    games = []
+    for size in sizes:
+        for n_players in player_counts:
+            for opponent in opponents:
+                for seed in seeds:
+                    games.append((["Overmind"] + [opponent] * (n_players - 1), size, seed))
+    return games
+
+# =============================================================================
+def score(result, player=0):
+    # a win is worth 1, plus our share of all banked halite
+    total = sum(result["halite"])
+    share = result["halite"][player] / total if total else 0
+    return (1.0 if result["winner"] == player else 0.0) + share
+
+# =============================================================================
+# batch_fitness - the same fitness from Arena.batch's model of the bots
+#
+# every genome plays every scenario in one BatchMatch per size and lineup,
+# which is far faster than real matches but only as good as the model
+# =============================================================================
+def batch_fitness(genomes, games):
+    groups = {}
+    for bots, size, seed in games:
+        groups.setdefault((size, tuple(bots[1:])), []).append(seed)
+
+    fitness = np.zeros(len(genomes))
+    for (size, opponents), seeds in groups.items():
+        policies = [params_policy(types.SimpleNamespace(**genome)) for genome in genomes]
+        ours = {key: np.repeat([p[key] for p in policies], len(seeds)) for key in policies[0]}
+        halite = BatchMatch(seeds * len(genomes), [ours] + [BATCH_POLICIES[o] for o in opponents], size).run()["halite"]
+
+        # score() per game, ties go to us as they do in Match
+        total = halite.sum(axis=1)
+        share = np.where(total > 0, halite[:, 0] / np.maximum(total, 1), 0)
+        won = halite[:, 0] >= halite.max(axis=1)
+        fitness += (won + share).reshape(len(genomes), -1).sum(axis=1)
+
+    return (fitness / len(games)).tolist()
+
+# =============================================================================
+def _init_worker():
+    # opponent failures are expected noise here, ours are counted instead
+    logging.disable(logging.CRITICAL)
+
+def _play(task):
+    # runs in a pool worker. Params is patched in place, which every Overmind
+    # module sees through its GAP import
+    genome, (bots, size, seed) = task
+    for name, value in genome.items():
+        setattr(Params, name, value)
+
+    return Match(bots, size, seed).run()
+
+# =============================================================================
+# Tuner - generational GA over Params with a process pool for matches
+#
+# each generation keeps the elite, fills the rest with tournament selected,
+# uniformly crossed and gaussian mutated children, and scores every new
+# genome on all scenarios, with real matches or with batch_fitness. the state
+# is written to the checkpoint after each generation and picked up again on
+# the next run
+# =============================================================================
+class Tuner:
+    def __init__(self, games, population=16, elite=2, mutation=0.3, seed=0, checkpoint=None, workers=None, cache=None, batch=False):
+        self.games = games
+        self.cache = cache
+        self.batch = batch
+        self.population_size = population
+        self.elite = elite
+        self.mutation = mutation
+        self.checkpoint = checkpoint
+        self.workers = workers or multiprocessing.cpu_count()
+
+        self.rng = random.Random(seed)
+        self.generation = 0
+        self.population = []
+        self.fitness = []
+        self.history = []
+
+        if checkpoint and os.path.exists(checkpoint):
+            self.load(checkpoint)
+
+    # -------------------------------------------------------------------------
+    def load(self, path):
+        with open(path) as f:
+            state = json.load(f)
+
+        version, internal, gauss = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss))
+        self.generation = state["generation"]
+        self.population = state["population"]
+        self.fitness = state["fitness"]
+        self.history = state["history"]
+        logging.info("Resumed {} at generation {}".format(path, self.generation))
+
+    def save(self, path):
+        state = {
+            "generation": self.generation,
+            "population": self.population,
+            "fitness": self.fitness,
+            "history": self.history,
+            "rng": self.rng.getstate(),
+        }
+        with open(path + ".tmp", "w") as f:
+            json.dump(state, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    # -------------------------------------------------------------------------
+    def evaluate(self, pool, genomes):
+        if self.batch:
+            return batch_fitness(genomes, self.games)
+
+        tasks = [(genome, game) for genome in genomes for game in self.games]
+        results = [None] * len(tasks)
+
+        # replayed matchups come out of the cache, only the rest hit the pool
+        keys = [None] * len(tasks)
+        if self.cache is not None:
+            for i, (genome, (bots, size, seed)) in enumerate(tasks):
+                keys[i] = self.cache.key(bots, size, seed, genome)
+                results[i] = self.cache.get(keys[i])
+
+        todo = [i for i, result in enumerate(results) if result is None]
+        for i, result in zip(todo, pool.map(_play, [tasks[i] for i in todo], chunksize=1)):
+            results[i] = result
+            if self.cache is not None:
+                self.cache.put(keys[i], result, tasks[i][0])
+
+        scores = [score(result) for result in results]
+        errors = sum(result["errors"][0] for result in results)
+        if errors:
+            logging.warning("Overmind raised on {} turns this generation".format(errors))
+
+        n = len(self.games)
+        return [sum(scores[i*n:(i + 1)*n]) / n for i in range(len(genomes))]
+
+    def select(self):
+        # best of three
+        picks = [self.rng.randrange(len(self.population)) for _ in range(3)]
+        return self.population[max(picks, key=lambda i: self.fitness[i])]
+
+    def breed(self):
+        ranked = sorted(range(len(self.population)), key=lambda i: -self.fitness[i])
+        elite = [self.population[i] for i in ranked[:self.elite]]
+        elite_fitness = [self.fitness[i] for i in ranked[:self.elite]]
+
+        children = []
+        while len(elite) + len(children) < self.population_size:
+            children.append(mutate(crossover(self.select(), self.select(), self.rng), self.rng, self.mutation))
+        return elite, elite_fitness, children
+
+    def run(self, generations):
+        with multiprocessing.Pool(self.workers, initializer=_init_worker) as pool:
+            if not self.population:
+                # seed with the hand tuned constants
+                self.population = [current_genome()]
+                while len(self.population) < self.population_size:
+                    self.population.append(random_genome(self.rng))
+                self.fitness = self.evaluate(pool, self.population)
+                self._record()
+
+            while self.generation < generations:
+                start = time.perf_counter()
+                elite, elite_fitness, children = self.breed()
+                self.population = elite + children
+                self.fitness = elite_fitness + self.evaluate(pool, children)
+                self.generation += 1
+                self._record()
+
+                logging.info("Generation {} best {:.3f} mean {:.3f} ({:.1f}s)".format(
+                    self.generation, self.history[-1]["best"], self.history[-1]["mean"], time.perf_counter() - start))
+
+        return self.best()
+
+    def _record(self):
+        best, fitness = self.best()
+        self.history.append({
+            "generation": self.generation,
+            "best": fitness,
+            "mean": sum(self.fitness) / len(self.fitness),
+            "genome": best,
+        })
+        if self.checkpoint:
+            self.save(self.checkpoint)
+
+    def best(self):
+        i = max(range(len(self.population)), key=lambda i: self.fitness[i])
+        return self.population[i], self.fitness[i]
+
+# =============================================================================
+def write_params(genome, path):
+    # same layout as Overmind/ga_param.py
+    lines = ["class Params:"]
+    for name in GENES:
+        lines.append("    {} = {!r}".format(name, genome[name]))
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Evolve Overmind.ga_param.Params against the other bots")
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--elite", type=int, default=2)
+    parser.add_argument("--mutation", type=float, default=0.3)
+    parser.add_argument("--opponents", nargs="+", default=["FUBot", "Gatherer"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[32, 48, 64])
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 4], choices=(2, 4))
+    parser.add_argument("--seeds", type=int, default=4, help="maps per size, player count and opponent")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the GA itself")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", default="tuner-checkpoint.json")
+    parser.add_argument("--out", default="ga_param_tuned.py")
+    parser.add_argument("--cache", default="arena-cache.sqlite", help="match result cache, empty to disable")
+    parser.add_argument("--batch", action="store_true", help="score on the Arena.batch model instead of real matches")
+    args = parser.parse_args()
+    if args.batch:
+        missing = [o for o in args.opponents if o not in BATCH_POLICIES]
+        if missing:
+            parser.error("no batch model of {}, use --opponents {}".format(", ".join(missing), " ".join(BATCH_POLICIES)))
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    games = scenarios(args.opponents, args.sizes, args.players, range(args.seeds))
+    cache = ResultCache(args.cache) if args.cache and not args.batch else None
+    tuner = Tuner(games, args.population, args.elite, args.mutation, args.seed, args.checkpoint, args.workers, cache, args.batch)
+    genome, fitness = tuner.run(args.generations)
+    if cache is not None:
+        logging.info("Cache {} hits, {} misses".format(cache.hits, cache.misses))
+
+    write_params(genome, args.out)
+    print("best fitness {:.3f} over {} games, written to {}".format(fitness, len(games), args.out))
+    for name in GENES:
+        print("    {} = {!r}".format(name, genome[name]))
+
+if __name__ == "__main__":
+    main()
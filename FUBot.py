@@ -19,6 +19,7 @@ import math
 import logging
 
 import FUBot.director as director
+import Overmind.log as LOG
 
 """ <<<Game Begin>>> """
 
@@ -45,6 +46,7 @@ while True:
     command_queue = d.update(game)
 
     # Send your moves back to the game environment, ending this turn.
-    logging.info(command_queue)
+    if LOG.HOT:
+        logging.info(command_queue)
     game.end_turn(command_queue)
 
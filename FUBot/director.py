@@ -7,20 +7,31 @@ from hlt.positionals import Position
 import logging
 
 import FUBot.strategy as STRAT
+from Overmind.budget import TurnBudget, TurnTimeout
+from Overmind.grid import HaliteGrid
 
 # =============================================================================
 class director:
     def __init__(self, game):
+        self.grid = HaliteGrid(game)
+        
         # select strategy based on map
         self.select_strategy(game)
         
     def update(self, game):
+        budget = TurnBudget()
         command_queue = []
+        self.grid.update(game)
         
-        if self.strategy:
-            command_queue = self.strategy.update(game)
+        try:
+            with budget.hard_stop():
+                if self.strategy:
+                    self.strategy.update(game, self.grid, budget, command_queue)
+        except TurnTimeout:
+            # the commands built so far still go out, fill() holds the rest
+            logging.error("Turn {} hit the hard deadline with {} commands queued".format(game.turn_number, len(command_queue)))
             
-        return command_queue
+        return budget.fill(game, command_queue)
         
     def select_strategy(self, game):
         n_players = len([x for x in game.players])
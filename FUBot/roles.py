@@ -9,6 +9,7 @@ import logging
 import random
 
 from FUBot.tools import get_path
+import Overmind.log as LOG
 
 # =============================================================================
 # blocker class - just navigate to a locatation and stay there
@@ -19,9 +20,10 @@ class blocker:
         self.target = None
         self.path = None
 
-    def update(self, ship, game):
+    def update(self, ship, game, grid):
         if self.target:
-            logging.info("current ship {} path: {}".format(self.id, self.path))
+            if LOG.HOT:
+                logging.info("current ship {} path: {}".format(self.id, self.path))
             if self.path:
                 # See if the last move was successful
                 if ship.position == self.path[0]:
@@ -40,9 +42,10 @@ class blocker:
                 
             else:
                 # acquire a new path
-                logging.info("Getting Path for Ship: {} from {} to {}".format(self.id, ship.position, self.target))
-                self.path = get_path(game, ship.position, self.target)
-                if self.path:
+                if LOG.HOT:
+                    logging.info("Getting Path for Ship: {} from {} to {}".format(self.id, ship.position, self.target))
+                self.path = get_path(game, grid, ship.position, self.target)
+                if LOG.HOT and self.path:
                     logging.info(self.path)
                 cmd = ship.stay_still()
                 
@@ -64,7 +67,7 @@ class gatherer:
         self.right_of_way = False
         self.delay = False
     
-    def update(self, ship, game):
+    def update(self, ship, game, grid):
         if self.state == gatherer.state.GATHER:
             cmd = self.gather(ship, game)
         elif self.state == gatherer.state.RETURN:
@@ -176,11 +179,13 @@ class gatherer:
         value_in_next_location = game.game_map[next_pos].halite_amount * 0.25
         value_in_current_location = game.game_map[ship.position].halite_amount * 0.25
         
-        logging.info("Cost to move: {}".format(cost_to_move))
-        logging.info("Value in next: {}".format(value_in_next_location))
+        if LOG.HOT:
+            logging.info("Cost to move: {}".format(cost_to_move))
+            logging.info("Value in next: {}".format(value_in_next_location))
         if cost_to_move <= ship.halite_amount and (value_in_next_location > (value_in_current_location + 3 * cost_to_move)):
             move = True
         
-        logging.info("MOVE? : {}".format(move))
+        if LOG.HOT:
+            logging.info("MOVE? : {}".format(move))
         return move
         
\ No newline at end of file
@@ -9,18 +9,18 @@ import logging
 
 from FUBot.tools import get_total_halite, get_targets
 from FUBot.roles import gatherer, blocker
+from Overmind.budget import atomic
+from Overmind.fleet import Fleet
 
 # =============================================================================
 class strategy:
-    def update():
+    def update(self, game, grid, budget, command_queue):
         logging.error("FAILED TO IMPLEMENT UPDATE METHOD IN STRATEGY SUBCLASS")
-        return []
         
 # =============================================================================
 class camp_enemy_base(strategy):
     def __init__(self, game):
-        self.gs = []
-        self.fus = []
+        self.fleet = Fleet()
         self.stop_spawning = False
         
         # set targets to surround other players base
@@ -32,86 +32,71 @@ class camp_enemy_base(strategy):
         self.targets = player.shipyard.position.get_surrounding_cardinals()
         logging.info(self.targets)
         
-    def update(self, game):
+    def new_role(self, ship):
+        # the first ships gather, then up to four block the enemy base
+        if self.fleet.count(gatherer) > 6 and self.fleet.count(blocker) < 4:
+            return blocker(ship.id)
+        return gatherer(ship.id)
+        
+    def update(self, game, grid, budget, command_queue):
         # You extract player metadata and the updated map metadata here for convenience.
         me = game.me
         game_map = game.game_map
         
-        # A command queue holds all the commands you will run this turn. You build this list up and submit it at the
-        #   end of the turn.
-        command_queue = []
-        
-        # remove sunk ships
-        for g in self.gs:
-            if not me.has_ship(g.id):
-                self.gs.remove(g)
-        for f in self.fus:
-            if not me.has_ship(f.id):
-                self.fus.remove(f)
-                
-        # get ships with no roles
-        roleless = []
-        for s in me.get_ships():
-            all_ships = self.gs + self.fus
-            if s.id not in [x.id for x in all_ships]:
-                roleless.append(s)
-        
-        # assign new roles
-        logging.info("Roleless: {}".format(roleless))
-        while roleless:
-            s = roleless[0]
-            if len(self.gs) > 6 and len(self.fus) < 4:
-                self.fus.append(blocker(s.id))
-            else:
-                self.gs.append(gatherer(s.id))
-            roleless.remove(s)
+        # The command queue belongs to the director. Commands are appended as they are built so the ones
+        #   made before a hard deadline still go out.
+        
+        # drop sunk ships and give new ships a role
+        self.fleet.reconcile(me.get_ships(), self.new_role)
         
-        # look for ships to add
-        # for s in me.get_ships():
-            # if s.id not in [x.id for x in self.gs]:
-                # self.gs.append(gatherer(s.id))
-
         # update gatherers
-        seekless = [x for x in self.gs if x.seek_p is None]
-        if seekless:
-            t = get_targets(game, len(seekless))
+        gs = self.fleet.of(gatherer)
+        seekless = [x for x in gs if x.seek_p is None]
+        if seekless and not budget.expired():
+            t = get_targets(game, grid, len(seekless))
             tidx = 0
             for seekship in seekless:
                 seekship.seek_p = t[tidx]
                 tidx += 1
         
-        for g in self.gs:
+        for g in gs:
+            if budget.expired():
+                break
             g_ship = me.get_ship(g.id)
-            command_queue.append(g.update(g_ship, game))
+            with atomic():
+                command_queue.append(g.update(g_ship, game, grid))
 
 
         # update fu-ers
-        for f in self.fus:
+        fus = self.fleet.of(blocker)
+        taken = [f.target for f in fus if f.target is not None]
+        for f in fus:
+            if budget.expired():
+                break
             if not f.target and self.targets:
                 logging.info("Acquiring target")
                 for t in self.targets:
-                    if t not in [x.target for x in self.fus if x.target is not None]:
+                    if t not in taken:
                         f.target = t
+                        taken.append(t)
                         logging.info("new target assigned: {}".format(t))
                         break
             fu_ship = me.get_ship(f.id)
-            command_queue.append(f.update(fu_ship, game))
+            with atomic():
+                command_queue.append(f.update(fu_ship, game, grid))
 
         # If the game is in the first 200 turns and you have enough halite, spawn a ship.
         # Don't spawn a ship if you currently have a ship at port, though - the ships will collide.
         if game.turn_number <= 150 and me.halite_amount >= constants.SHIP_COST and not game_map[me.shipyard].is_occupied and len(me.get_ships()) < 15 and not self.stop_spawning:
-            if (get_total_halite(game) > 50000):
+            if (get_total_halite(grid) > 50000):
                 command_queue.append(me.shipyard.spawn())
             else:
                 self.stop_spawning = True
 
-        return command_queue
-
 # =============================================================================
 class camp_enemy_base_4p(strategy):
     def __init__(self, game):
-        self.gs = []
-        self.fus = []
+        self.fleet = Fleet()
         self.stop_spawning = False
         
         # set targets to camp on all other bases
@@ -122,130 +107,108 @@ class camp_enemy_base_4p(strategy):
                 
         logging.info(self.targets)
         
-    def update(self, game):
+    def new_role(self, ship):
+        # the first ships gather, then one blocker per enemy base
+        if self.fleet.count(gatherer) > 6 and self.fleet.count(blocker) < len(self.targets):
+            return blocker(ship.id)
+        return gatherer(ship.id)
+        
+    def update(self, game, grid, budget, command_queue):
         # You extract player metadata and the updated map metadata here for convenience.
         me = game.me
         game_map = game.game_map
         
-        # A command queue holds all the commands you will run this turn. You build this list up and submit it at the
-        #   end of the turn.
-        command_queue = []
-        
-        # remove sunk ships
-        for g in self.gs:
-            if not me.has_ship(g.id):
-                self.gs.remove(g)
-        for f in self.fus:
-            if not me.has_ship(f.id):
-                self.fus.remove(f)
-                
-        # get ships with no roles
-        roleless = []
-        for s in me.get_ships():
-            all_ships = self.gs + self.fus
-            if s.id not in [x.id for x in all_ships]:
-                roleless.append(s)
-        
-        # assign new roles
-        logging.info("Roleless: {}".format(roleless))
-        while roleless:
-            s = roleless[0]
-            if len(self.gs) > 6 and len(self.fus) < len(self.targets):
-                self.fus.append(blocker(s.id))
-            else:
-                self.gs.append(gatherer(s.id))
-            roleless.remove(s)
+        # The command queue belongs to the director. Commands are appended as they are built so the ones
+        #   made before a hard deadline still go out.
+        
+        # drop sunk ships and give new ships a role
+        self.fleet.reconcile(me.get_ships(), self.new_role)
         
-        # look for ships to add
-        # for s in me.get_ships():
-            # if s.id not in [x.id for x in self.gs]:
-                # self.gs.append(gatherer(s.id))
-
         # update gatherers
-        seekless = [x for x in self.gs if x.seek_p is None]
-        if seekless:
-            t = get_targets(game, len(seekless))
+        gs = self.fleet.of(gatherer)
+        seekless = [x for x in gs if x.seek_p is None]
+        if seekless and not budget.expired():
+            t = get_targets(game, grid, len(seekless))
             tidx = 0
             for seekship in seekless:
                 seekship.seek_p = t[tidx]
                 tidx += 1
         
-        for g in self.gs:
+        for g in gs:
+            if budget.expired():
+                break
             g_ship = me.get_ship(g.id)
-            command_queue.append(g.update(g_ship, game))
+            with atomic():
+                command_queue.append(g.update(g_ship, game, grid))
 
 
         # update fu-ers
-        for f in self.fus:
+        fus = self.fleet.of(blocker)
+        taken = [f.target for f in fus if f.target is not None]
+        for f in fus:
+            if budget.expired():
+                break
             if not f.target and self.targets:
                 logging.info("Acquiring target")
                 for t in self.targets:
-                    if t not in [x.target for x in self.fus if x.target is not None]:
+                    if t not in taken:
                         f.target = t
+                        taken.append(t)
                         logging.info("new target assigned: {}".format(t))
                         break
             fu_ship = me.get_ship(f.id)
-            command_queue.append(f.update(fu_ship, game))
+            with atomic():
+                command_queue.append(f.update(fu_ship, game, grid))
 
         # If the game is in the first 200 turns and you have enough halite, spawn a ship.
         # Don't spawn a ship if you currently have a ship at port, though - the ships will collide.
         if game.turn_number <= 150 and me.halite_amount >= constants.SHIP_COST and not game_map[me.shipyard].is_occupied and len(me.get_ships()) < 15 and not self.stop_spawning:
-            if (get_total_halite(game) > 50000):
+            if (get_total_halite(grid) > 50000):
                 command_queue.append(me.shipyard.spawn())
             else:
                 self.stop_spawning = True
 
-        return command_queue
-
 # =============================================================================
 class gather_passive(strategy):
     def __init__(self, game):
-        self.gs = []
+        self.fleet = Fleet()
         self.stop_spawning = False
         
-    def update(self, game):
+    def update(self, game, grid, budget, command_queue):
         # You extract player metadata and the updated map metadata here for convenience.
         me = game.me
         game_map = game.game_map
         
-        # A command queue holds all the commands you will run this turn. You build this list up and submit it at the
-        #   end of the turn.
-        command_queue = []
-        
-        # look for ships to add
-        for s in me.get_ships():
-            if s.id not in [x.id for x in self.gs]:
-                self.gs.append(gatherer(s.id))
-        # logging.info("ADDED SHIPS")
-        
-        # look for ships to remove
-        for g in self.gs:
-            if not me.has_ship(g.id):
-                self.gs.remove(g)
-        # logging.info("REMOVING SHIPS")
+        # The command queue belongs to the director. Commands are appended as they are built so the ones
+        #   made before a hard deadline still go out.
+        
+        # drop sunk ships, new ships start out gathering
+        self.fleet.reconcile(me.get_ships(), lambda s: gatherer(s.id))
+        gs = self.fleet.of(gatherer)
                 
         # update all ships
-        seekless = [x for x in self.gs if x.seek_p is None]
-        if seekless:
-            t = get_targets(game, len(seekless))
+        seekless = [x for x in gs if x.seek_p is None]
+        if seekless and not budget.expired():
+            t = get_targets(game, grid, len(seekless))
             tidx = 0
             for seekship in seekless:
                 seekship.seek_p = t[tidx]
                 tidx += 1
         # logging.info("UPDATED SEEK LOCATIONS SHIPS")
         
-        for g in self.gs:
+        for g in gs:
+            if budget.expired():
+                break
             g_ship = me.get_ship(g.id)
-            command_queue.append(g.update(g_ship, game))
+            with atomic():
+                command_queue.append(g.update(g_ship, game, grid))
         # logging.info("UPDATED SHIPS")
                 
         # If the game is in the first 200 turns and you have enough halite, spawn a ship.
         # Don't spawn a ship if you currently have a ship at port, though - the ships will collide.
         if game.turn_number <= 150 and me.halite_amount >= constants.SHIP_COST and not game_map[me.shipyard].is_occupied and len(me.get_ships()) < 15 and not self.stop_spawning:
-            if (get_total_halite(game) > 50000):
+            if (get_total_halite(grid) > 50000):
                 command_queue.append(me.shipyard.spawn())
             else:
                 self.stop_spawning = True
-
-        return command_queue
         
\ No newline at end of file
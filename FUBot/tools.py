@@ -5,56 +5,31 @@ import hlt
 from hlt import constants
 from hlt.positionals import Direction
 
+from Overmind.tools import get_path
+
 import logging
 import math
 
+# no two targets from get_targets are within this many steps of each other
+TARGET_SPREAD = 1
+
 # =============================================================================
-def get_total_halite(game):
-    halite = 0
-    for x in range(game.game_map.width):
-        for y in range(game.game_map.height):
-            p = hlt.Position(x, y)
-            halite += game.game_map[p].halite_amount
-            
-    return halite
+def get_total_halite(grid):
+    return grid.total_halite()
 
 # =============================================================================
 # get targets - find the places with the most concentrated halite on the map
 # =============================================================================
-def get_targets(game, n):
-    p_dist = [-1, 0, 1]
-    map_values = {}
+def get_targets(game, grid, n, spread=TARGET_SPREAD):
+    # for every position add up the halite values of the surrounding cells
+    values = grid.window_sum(1)
     
-    for x in range(game.game_map.width):
-        for y in range(game.game_map.height):
-            p = hlt.Position(x, y)
-            value = 0
-            
-            # for this position get the surrounding cells and add up the halite values
-            for dx in p_dist:
-                for dy in p_dist:
-                    temp_p = hlt.Position(x+dx, y+dy)
-                    p_n = game.game_map.normalize(temp_p)
-                    value += game.game_map[p_n].halite_amount
-            
-            dist = game.game_map.calculate_distance(game.me.shipyard.position, p)
-            max_dist = math.sqrt((game.game_map.width*game.game_map.width/4) + (game.game_map.height*game.game_map.height/4))
-            
-            d_max = 3
-            d_value = 1 + ((dist / max_dist) * (d_max - 1))
-            
-            value = value / d_value
-
-            map_values[p] = value
-            
-    # sort map_values and return the best n positions
-    sorted_d = sorted(map_values.items(), key=lambda x: x[1], reverse=True)
+    dist = grid.dist.manhattan_from(game.me.shipyard.position)
+    d_max = 3
+    d_value = 1 + ((dist / grid.dist.max_dist) * (d_max - 1))
     
-    targets = []
-    for i in range(n):
-        targets.append(sorted_d[i][0])
-
-    return targets
+    # return the best n positions
+    return grid.best_positions(values / d_value, n, spread)
 
 # =============================================================================
 def get_dist(game, p1, p2):
@@ -70,62 +45,3 @@ def get_dist(game, p1, p2):
         dy = h - dy
         
     return math.sqrt((dx * dx) + (dy * dy))
-    
-# =============================================================================
-# A* pathfinding
-# =============================================================================
-def get_path(game, p1, p2):
-    
-    class Node:
-        def __init__(self, pos):
-            self.previous = None
-            self.h = None
-            self.cost = 0
-            self.p = pos
-            
-    if p1 == p2 or game.game_map[p2].is_occupied:
-        return None
-        
-    start_node = Node(p1)
-    evaluated_nodes = []
-    leaf_nodes = []
-    
-    head_node = start_node
-    while True:
-        # get new leaf nodes
-        new_leaf_positions = head_node.p.get_surrounding_cardinals()
-        new_leaf_positions = [x for x in new_leaf_positions if x not in [n.p for n in evaluated_nodes]]
-        new_leaf_positions = [x for x in new_leaf_positions if not game.game_map[x].is_occupied]
-        
-        # new_leaf_positions = [x for x in head_node.p.get_surrounding_cardinals() if not game.game_map[x].is_occupied and x not in evaluated_nodes]
-        
-        # evaluate leaf nodes
-        for pos in new_leaf_positions:
-            nn = Node(pos)
-            nn.previous = head_node
-            nn.cost = head_node.cost + 1
-            
-            if pos == p2:
-                # found a path, generate a list of positions and return items
-                logging.info("Path found!")
-                path = [pos]
-                p_node = nn.previous
-                while True:
-                    if p_node.previous is None:
-                        return path[::-1]
-                        
-                    path.append(p_node.p)
-                    p_node = p_node.previous
-            else:
-                nn.h = get_dist(game, nn.p, p2)
-                leaf_nodes.append(nn)
-                evaluated_nodes.append(nn)
-        
-        # update head node
-        if not leaf_nodes:
-            # no new nodes, return failure
-            return None
-        else:
-            leaf_nodes.sort(key=lambda node: node.cost + node.h)
-            head_node = leaf_nodes.pop(0)
-    
\ No newline at end of file
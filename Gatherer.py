@@ -18,53 +18,30 @@ import random
 import logging
 import math
 
+from Overmind.fleet import Fleet
+from Overmind.grid import HaliteGrid
+import Overmind.log as LOG
+
+# no two targets from get_targets are within this many steps of each other
+TARGET_SPREAD = 1
+
 # =============================================================================
-def get_total_halite(game):
-    halite = 0
-    for x in range(game.game_map.width):
-        for y in range(game.game_map.height):
-            p = hlt.Position(x, y)
-            halite += game.game_map[p].halite_amount
-            
-    return halite
+def get_total_halite(grid):
+    return grid.total_halite()
 
 # =============================================================================
 # get targets - find the places with the most concentrated halite on the map
 # =============================================================================
-def get_targets(game, n):
-    p_dist = [-1, 0, 1]
-    map_values = {}
+def get_targets(game, grid, n, spread=TARGET_SPREAD):
+    # for every position add up the halite values of the surrounding cells
+    values = grid.window_sum(1)
     
-    for x in range(game.game_map.width):
-        for y in range(game.game_map.height):
-            p = hlt.Position(x, y)
-            value = 0
-            
-            # for this position get the surrounding cells and add up the halite values
-            for dx in p_dist:
-                for dy in p_dist:
-                    temp_p = hlt.Position(x+dx, y+dy)
-                    p_n = game.game_map.normalize(temp_p)
-                    value += game.game_map[p_n].halite_amount
-            
-            dist = game.game_map.calculate_distance(game.me.shipyard.position, p)
-            max_dist = math.sqrt((game.game_map.width*game.game_map.width/4) + (game.game_map.height*game.game_map.height/4))
-            
-            d_max = 3
-            d_value = 1 + ((dist / max_dist) * (d_max - 1))
-            
-            value = value / d_value
-
-            map_values[p] = value
-            
-    # sort map_values and return the best n positions
-    sorted_d = sorted(map_values.items(), key=lambda x: x[1], reverse=True)
+    dist = grid.dist.manhattan_from(game.me.shipyard.position)
+    d_max = 3
+    d_value = 1 + ((dist / grid.dist.max_dist) * (d_max - 1))
     
-    targets = []
-    for i in range(n):
-        targets.append(sorted_d[i][0])
-
-    return targets
+    # return the best n positions
+    return grid.best_positions(values / d_value, n, spread)
 
 # =============================================================================
 # Gatherer class - Use a FSM to gather and return resources
@@ -194,77 +171,91 @@ class gatherer:
         value_in_next_location = game.game_map[next_pos].halite_amount * 0.25
         value_in_current_location = game.game_map[ship.position].halite_amount * 0.25
         
-        logging.info("Cost to move: {}".format(cost_to_move))
-        logging.info("Value in next: {}".format(value_in_next_location))
+        if LOG.HOT:
+            logging.info("Cost to move: {}".format(cost_to_move))
+            logging.info("Value in next: {}".format(value_in_next_location))
         if cost_to_move <= ship.halite_amount and (value_in_next_location > (value_in_current_location + 3 * cost_to_move)):
             move = True
         
-        logging.info("MOVE? : {}".format(move))
+        if LOG.HOT:
+            logging.info("MOVE? : {}".format(move))
         return move
 
-""" <<<Game Begin>>> """
+# =============================================================================
+# director - the per turn logic, kept out of the game loop so the bot can also
+# be driven in process (see Arena.sim)
+# =============================================================================
+class director:
+    def __init__(self, game):
+        self.grid = HaliteGrid(game)
+        
+        # gatherer for each of our ships
+        self.fleet = Fleet()
+        self.stop_spawning = False
+        
+    def update(self, game):
+        grid = self.grid
+        grid.update(game)
+        # You extract player metadata and the updated map metadata here for convenience.
+        me = game.me
+        game_map = game.game_map
+        
+        # A command queue holds all the commands you will run this turn. You build this list up and submit it at the
+        #   end of the turn.
+        command_queue = []
+       
+        # drop sunk ships, new ships start out gathering
+        self.fleet.reconcile(me.get_ships(), lambda s: gatherer(s.id))
+        gatherers = self.fleet.of(gatherer)
+                
+        # update all ships
+        seekless = [x for x in gatherers if x.seek_p is None]
+        if seekless:
+            t = get_targets(game, grid, len(seekless))
+            tidx = 0
+            for seekship in seekless:
+                seekship.seek_p = t[tidx]
+                tidx += 1
+        
+        for g in gatherers:
+            g_ship = me.get_ship(g.id)
+            command_queue.append(g.update(g_ship, game))
+                
+        # If the game is in the first 200 turns and you have enough halite, spawn a ship.
+        # Don't spawn a ship if you currently have a ship at port, though - the ships will collide.
+        if game.turn_number <= 150 and me.halite_amount >= constants.SHIP_COST and not game_map[me.shipyard].is_occupied and len(me.get_ships()) < 15 and not self.stop_spawning:
+            if (get_total_halite(grid) > 50000):
+                command_queue.append(me.shipyard.spawn())
+            else:
+                self.stop_spawning = True
 
-# This game object contains the initial game state.
-game = hlt.Game()
-# At this point "game" variable is populated with initial map data.
-# This is a good place to do computationally expensive start-up pre-processing.
+        return command_queue
 
-# As soon as you call "ready" function below, the 2 second per turn timer will start.
-game.ready("Gatherer")
+if __name__ == "__main__":
+    """ <<<Game Begin>>> """
 
-# Now that your bot is initialized, save a message to yourself in the log file with some important information.
-#   Here, you log here your id, which you can always fetch from the game object by using my_id.
-logging.info("Successfully created bot! My Player ID is {}.".format(game.my_id))
+    # This game object contains the initial game state.
+    game = hlt.Game()
+    # At this point "game" variable is populated with initial map data.
+    # This is a good place to do computationally expensive start-up pre-processing.
+    d = director(game)
 
-""" <<<Game Loop>>> """
+    # As soon as you call "ready" function below, the 2 second per turn timer will start.
+    game.ready("Gatherer")
 
-#initialized list of gatherers
-gatherers = []
-stop_spawning = False
-while True:
-    # This loop handles each turn of the game. The game object changes every turn, and you refresh that state by
-    #   running update_frame().
-    game.update_frame()
-    # You extract player metadata and the updated map metadata here for convenience.
-    me = game.me
-    game_map = game.game_map
-    
-    # A command queue holds all the commands you will run this turn. You build this list up and submit it at the
-    #   end of the turn.
-    command_queue = []
-   
-    # look for ships to add
-    for s in me.get_ships():
-        if s.id not in [x.id for x in gatherers]:
-            gatherers.append(gatherer(s.id))
+    # Now that your bot is initialized, save a message to yourself in the log file with some important information.
+    #   Here, you log here your id, which you can always fetch from the game object by using my_id.
+    logging.info("Successfully created bot! My Player ID is {}.".format(game.my_id))
 
-    # look for ships to remove
-    for g in gatherers:
-        if not me.has_ship(g.id):
-            gatherers.remove(g)
-            
-    # update all ships
-    seekless = [x for x in gatherers if x.seek_p is None]
-    if seekless:
-        t = get_targets(game, len(seekless))
-        tidx = 0
-        for seekship in seekless:
-            seekship.seek_p = t[tidx]
-            tidx += 1
-    
-    for g in gatherers:
-        g_ship = me.get_ship(g.id)
-        command_queue.append(g.update(g_ship, game))
-            
-    # If the game is in the first 200 turns and you have enough halite, spawn a ship.
-    # Don't spawn a ship if you currently have a ship at port, though - the ships will collide.
-    if game.turn_number <= 150 and me.halite_amount >= constants.SHIP_COST and not game_map[me.shipyard].is_occupied and len(me.get_ships()) < 15 and not stop_spawning:
-        if (get_total_halite(game) > 50000):
-            command_queue.append(me.shipyard.spawn())
-        else:
-            stop_spawning = True
+    """ <<<Game Loop>>> """
+    while True:
+        # This loop handles each turn of the game. The game object changes every turn, and you refresh that state by
+        #   running update_frame().
+        game.update_frame()
 
-    # Send your moves back to the game environment, ending this turn.
-    logging.info(command_queue)
-    game.end_turn(command_queue)
+        command_queue = d.update(game)
 
+        # Send your moves back to the game environment, ending this turn.
+        if LOG.HOT:
+            logging.info(command_queue)
+        game.end_turn(command_queue)
@@ -19,6 +19,8 @@ import math
 import logging
 
 import Overmind.director as director
+import Overmind.frame as frame
+import Overmind.log as LOG
 
 """ <<<Game Begin>>> """
 
@@ -27,6 +29,14 @@ game = hlt.Game()
 # At this point "game" variable is populated with initial map data.
 # This is a good place to do computationally expensive start-up pre-processing.
 
+# hold log records in memory, they only hit the disk on an error or at the
+# end of the game. done here and not in the director so bots run in process
+# (Arena.sim, the tuner, the bench) leave the host's logging alone
+LOG.install()
+
+# read the rest of the frames in bulk straight into arrays
+frame.install(game)
+
 d = director.director(game)
 
 # As soon as you call "ready" function below, the 2 second per turn timer will start.
@@ -45,6 +55,7 @@ while True:
     command_queue = d.update(game)
 
     # Send your moves back to the game environment, ending this turn.
-    logging.info(command_queue)
+    if LOG.HOT:
+        logging.info(command_queue)
     game.end_turn(command_queue)
 
@@ -0,0 +1,86 @@
+# Python 3.6
+
+import numpy as np
+
+# =============================================================================
+# hungarian - maximum score assignment of rows to distinct columns
+#
+# scores is an (S, C) array with S <= C. returns the column picked for every
+# row. this is the shortest augmenting path form of the hungarian method with
+# the inner loops done as numpy row operations, O(S^2 * C)
+# =============================================================================
+def hungarian(scores):
+    n, m = scores.shape
+    cost = scores.max() - scores
+
+    # potentials and column owners, index 0 is a dummy column
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+
+            free = ~used
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+
+            masked = np.where(free[1:], minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        # walk the augmenting path back to the dummy column
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.zeros(n, dtype=np.int64)
+    for j in range(1, m + 1):
+        if p[j]:
+            cols[p[j] - 1] = j - 1
+
+    return cols
+
+# =============================================================================
+# peaks - flat indices of cells no lower than any of their 8 neighbours
+# =============================================================================
+def peaks(values):
+    best = values
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            if dy or dx:
+                best = np.maximum(best, np.roll(values, (dy, dx), axis=(0, 1)))
+
+    return np.flatnonzero(values >= best)
+
+# =============================================================================
+# top_columns - union of the best k columns of every row
+#
+# keeping each row's top S columns can't change the optimal assignment, so the
+# solver only needs to see this subset
+# =============================================================================
+def top_columns(scores, k):
+    if k >= scores.shape[1]:
+        return np.arange(scores.shape[1])
+
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.unique(best)
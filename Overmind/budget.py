@@ -0,0 +1,106 @@
+# Python 3.6
+
+import logging
+import signal
+import threading
+import time
+
+from contextlib import contextmanager
+
+# seconds the engine allows per turn, and how much of it we keep in reserve for
+# frame parsing, the fallback commands and sending the turn
+TURN_LIMIT = 2.0
+MARGIN = 0.3
+
+# =============================================================================
+class TurnTimeout(Exception):
+    pass
+
+# open atomic() blocks, and whether a hard stop is waiting for them to close
+_atomic = 0
+_deferred = False
+
+# =============================================================================
+# atomic - hold off a hard stop until the block is done
+#
+# the hard stop is raised from a signal handler, at any bytecode. fleet
+# changes, plan updates and a ship's role update plus its command go in these
+# blocks so a timeout never leaves them half done. the blocks are short or
+# check expired() themselves, so the stop is at most a little late
+# =============================================================================
+@contextmanager
+def atomic():
+    global _atomic, _deferred
+    _atomic += 1
+    try:
+        yield
+    finally:
+        _atomic -= 1
+    if _atomic == 0 and _deferred:
+        _deferred = False
+        raise TurnTimeout()
+
+# =============================================================================
+# TurnBudget - wall clock deadline for one turn
+#
+# expensive stages call expired()/allows() and yield when time is short. the
+# hard_stop() guard interrupts anything that overruns anyway, outside atomic()
+# blocks, and fill() makes sure every ship still gets a safe command
+# =============================================================================
+class TurnBudget:
+    def __init__(self, limit=TURN_LIMIT, margin=MARGIN):
+        self.start = time.perf_counter()
+        self.deadline = self.start + limit - margin
+        self.hard_deadline = self.start + limit - (margin / 2)
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def remaining(self):
+        return self.deadline - time.perf_counter()
+
+    def expired(self):
+        return time.perf_counter() >= self.deadline
+
+    def allows(self, seconds):
+        return self.remaining() > seconds
+
+    @contextmanager
+    def hard_stop(self):
+        # raise TurnTimeout in the main thread once the hard deadline passes.
+        # signals can only be handled there, other threads get no alarm
+        global _deferred
+        if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+            yield
+            return
+
+        def _timeout(signum, frame):
+            global _deferred
+            if _atomic:
+                _deferred = True
+            else:
+                raise TurnTimeout()
+
+        _deferred = False
+        previous = signal.signal(signal.SIGALRM, _timeout)
+        signal.setitimer(signal.ITIMER_REAL, max(self.hard_deadline - time.perf_counter(), 0.001))
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+            _deferred = False
+
+    def fill(self, game, command_queue):
+        # add a stay still command for every ship the strategy did not get to
+        commanded = set()
+        for cmd in command_queue:
+            parts = cmd.split()
+            if len(parts) > 1:
+                commanded.add(int(parts[1]))
+
+        missing = [s for s in game.me.get_ships() if s.id not in commanded]
+        if missing:
+            logging.warning("Turn {}: {} ships left without a command after {:.3f}s".format(game.turn_number, len(missing), self.elapsed()))
+
+        return command_queue + [s.stay_still() for s in missing]
@@ -6,19 +6,50 @@ from hlt import constants
 from hlt.positionals import Position
 
 import logging
+import os
 
 import Overmind.strategy as STRAT
+from Overmind.budget import TurnBudget, TurnTimeout
+from Overmind.grid import HaliteGrid
+from Overmind.perf import profiler
+from Overmind.resolve import resolve
 
 # =============================================================================
 class director:
     def __init__(self, game):
+        # per turn timings go next to the bot log when OVERMIND_PROFILE is set
+        if os.environ.get("OVERMIND_PROFILE"):
+            profiler.enable("bot-{}-profile.jsonl".format(game.my_id))
+            
+        self.grid = HaliteGrid(game)
+        
         # select strategy based on map
-        self.strategy = STRAT.gather_passive(game)
+        self.strategy = STRAT.gather_passive(game, self.grid)
         
     def update(self, game):
+        budget = TurnBudget()
+        profiler.start_turn()
         command_queue = []
+        self.grid.update(game)
+        profiler.lap("grid")
 
-        if self.strategy:
-            command_queue = self.strategy.update(game)
+        try:
+            with budget.hard_stop():
+                if self.strategy:
+                    self.strategy.update(game, self.grid, budget, command_queue)
+        except TurnTimeout:
+            # the commands built so far still go out, fill() holds the rest
+            logging.error("Turn {} hit the hard deadline with {} commands queued".format(game.turn_number, len(command_queue)))
             
+        command_queue = budget.fill(game, command_queue)
+        
+        # settle the whole fleet's moves at once so no two of our ships collide
+        if self.strategy:
+            command_queue = resolve(game, command_queue, self.strategy.may_crash, self.strategy.goal)
+        else:
+            command_queue = resolve(game, command_queue)
+        profiler.lap("resolve")
+        profiler.count("ships", len(game.me.get_ships()))
+        profiler.end_turn(game.turn_number)
+        
         return command_queue
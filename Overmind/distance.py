@@ -0,0 +1,40 @@
+# Python 3.6
+
+import numpy as np
+
+# =============================================================================
+# DistanceTable - toroidal distances precomputed for a fixed map size
+#
+# the tables are indexed by offset [(y2 - y1) % height, (x2 - x1) % width] so a
+# single lookup answers any query, and rolling a table by a position gives the
+# distance from that position to every cell
+# =============================================================================
+class DistanceTable:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+        dx = np.arange(width)
+        dx = np.minimum(dx, width - dx)
+        dy = np.arange(height)
+        dy = np.minimum(dy, height - dy)
+
+        self.manhattan_table = (dy[:, None] + dx[None, :]).astype(np.int32)
+        self.euclidean_table = np.sqrt((dy[:, None] * dy[:, None]) + (dx[None, :] * dx[None, :]))
+        self.max_dist = np.sqrt((width*width/4) + (height*height/4))
+
+        # plain lists are faster than numpy for single element reads
+        self._manhattan = self.manhattan_table.tolist()
+        self._euclidean = self.euclidean_table.tolist()
+
+    def manhattan(self, p1, p2):
+        return self._manhattan[(p2.y - p1.y) % self.height][(p2.x - p1.x) % self.width]
+
+    def euclidean(self, p1, p2):
+        return self._euclidean[(p2.y - p1.y) % self.height][(p2.x - p1.x) % self.width]
+
+    def manhattan_from(self, pos):
+        return np.roll(self.manhattan_table, (pos.y % self.height, pos.x % self.width), axis=(0, 1))
+
+    def euclidean_from(self, pos):
+        return np.roll(self.euclidean_table, (pos.y % self.height, pos.x % self.width), axis=(0, 1))
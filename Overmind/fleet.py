@@ -0,0 +1,75 @@
+# Python 3.6
+
+from Overmind.budget import atomic
+
+# =============================================================================
+# Fleet - which role object drives each of our ships
+#
+# roles are held in a dict by ship id and again per role class, so membership,
+# lookups and role changes are O(1) and a turn's bookkeeping is one pass over
+# the ships. every query returns a new list, so the fleet can be changed while
+# looping over a query result. roles of a class come back in the order they
+# joined it
+# =============================================================================
+class Fleet:
+    def __init__(self):
+        self.roles = {}
+        self._kinds = {}
+
+    def __len__(self):
+        return len(self.roles)
+
+    def __contains__(self, id):
+        return id in self.roles
+
+    def get(self, id):
+        return self.roles.get(id)
+
+    # -------------------------------------------------------------------------
+    def assign(self, role):
+        # give role.id this role, replacing whatever it had before
+        with atomic():
+            self.remove(role.id)
+            self.roles[role.id] = role
+            self._kinds.setdefault(type(role), {})[role.id] = role
+
+    def remove(self, id):
+        with atomic():
+            role = self.roles.pop(id, None)
+            if role is not None:
+                del self._kinds[type(role)][id]
+        return role
+
+    def reconcile(self, ships, new_role):
+        # drop the roles of sunk ships, then call new_role(ship) for every ship
+        # without one. returns the ids that were dropped
+        alive = {s.id for s in ships}
+        sunk = [id for id in self.roles if id not in alive]
+        for id in sunk:
+            self.remove(id)
+
+        for s in ships:
+            if s.id not in self.roles:
+                self.assign(new_role(s))
+
+        return sunk
+
+    # -------------------------------------------------------------------------
+    def of(self, kind, where=None):
+        # roles of a class, optionally filtered by where(role)
+        roles = self._kinds.get(kind, {}).values()
+        if where is None:
+            return list(roles)
+        return [r for r in roles if where(r)]
+
+    def is_role(self, id, kind, where=None):
+        # does ship id have a role of this class that passes where(role)
+        role = self.roles.get(id)
+        return type(role) is kind and (where is None or where(role))
+
+    def count(self, kind):
+        return len(self._kinds.get(kind, ()))
+
+    def ships(self, player, kind, where=None):
+        # the player's ships whose role matches, in the player's ship order
+        return [s for s in player.get_ships() if self.is_role(s.id, kind, where)]
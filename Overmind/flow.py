@@ -0,0 +1,73 @@
+# Python 3.6
+
+import hlt
+
+from hlt.positionals import Direction
+
+import numpy as np
+
+from Overmind.resolve import is_passable
+
+# =============================================================================
+# FlowField - per turn distance field toward a set of source cells
+#
+# built with a numpy wavefront on the torus, so the cost is one O(W*H) pass per
+# step of distance. blocked cells (enemy ships) are never entered. ships read
+# their next move from the field in O(1) instead of navigating on their own
+# =============================================================================
+class FlowField:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.unreached = width * height
+        self.dist = np.full((height, width), self.unreached, dtype=np.int32)
+        self._dist = self.dist.tolist()
+
+    def update(self, sources, blocked):
+        # sources and blocked are boolean [y, x] masks
+        self.dist.fill(self.unreached)
+        self.dist[sources] = 0
+
+        passable = ~blocked
+        frontier = sources.copy()
+        d = 0
+        while frontier.any():
+            d += 1
+            frontier = (np.roll(frontier, 1, axis=0) | np.roll(frontier, -1, axis=0) |
+                        np.roll(frontier, 1, axis=1) | np.roll(frontier, -1, axis=1))
+            frontier &= passable
+            frontier &= self.dist == self.unreached
+            self.dist[frontier] = d
+
+        self._dist = self.dist.tolist()
+
+    def distance(self, pos):
+        return self._dist[pos.y % self.height][pos.x % self.width]
+
+    def step(self, game, ship, slack=0, crash=False):
+        # pick the free neighbour that gets closest to a source, cells our own
+        # ships are leaving count as free. slack lets the ship side-step onto
+        # cells no further away, crash lets it move onto an occupied source
+        # cell. the chosen cell is marked unsafe
+        game_map = game.game_map
+        limit = self.distance(ship.position) - 1 + slack
+
+        best_dir = Direction.Still
+        best_d = limit + 1
+        best_pos = None
+        for direction in Direction.get_all_cardinals():
+            pos = game_map.normalize(ship.position.directional_offset(direction))
+            d = self._dist[pos.y][pos.x]
+            if d >= best_d:
+                continue
+            if not is_passable(game, pos) and not (crash and d == 0):
+                continue
+
+            best_dir = direction
+            best_d = d
+            best_pos = pos
+
+        if best_pos is not None:
+            game_map[best_pos].mark_unsafe(ship)
+
+        return best_dir
@@ -0,0 +1,154 @@
+# Python 3.6
+
+import hlt
+from hlt.entity import Dropoff, Ship
+from hlt.positionals import Position
+
+import logging
+import sys
+
+import numpy as np
+
+# =============================================================================
+# FrameReader - bulk replacement for hlt.Game.update_frame()
+#
+# the engine sends a whole frame and then waits for our commands, so the frame
+# is pulled off stdin with as few reads as it takes and parsed in one numpy
+# call. the records land in preallocated arrays:
+#
+#   ships     (n, 5) owner, id, x, y, halite
+#   dropoffs  (n, 4) owner, id, x, y
+#   updates   (n, 3) x, y, halite of every cell the engine changed
+#   halite    banked halite per player id
+#
+# game.players and game.game_map are then refreshed from the arrays so the
+# role code keeps working on the usual hlt objects
+# =============================================================================
+class FrameReader:
+    def __init__(self, game, stream=None):
+        self.game = game
+        self.stream = stream if stream is not None else sys.stdin.buffer
+        self.n_players = len(game.players)
+
+        self._ships = np.zeros((64, 5), dtype=np.int64)
+        self._dropoffs = np.zeros((16, 4), dtype=np.int64)
+        self.ships = self._ships[:0]
+        self.dropoffs = self._dropoffs[:0]
+        self.updates = np.zeros((0, 3), dtype=np.int64)
+        self.halite = np.zeros(max(game.players) + 1, dtype=np.int64)
+
+    # -------------------------------------------------------------------------
+    def _frame_length(self, tokens):
+        # number of ints in the frame, None while the headers are incomplete
+        i = 1
+        for _ in range(self.n_players):
+            if len(tokens) < i + 4:
+                return None
+            i += 4 + 4*int(tokens[i + 1]) + 3*int(tokens[i + 2])
+        if len(tokens) <= i:
+            return None
+        return i + 1 + 3*int(tokens[i])
+
+    def read(self):
+        data = b""
+        while True:
+            chunk = self.stream.read1(1 << 16)
+            if not chunk:
+                raise SystemExit("EOF when reading a frame")
+            data += chunk
+
+            # a partial line would parse as a truncated number
+            if not data.endswith(b"\n"):
+                continue
+            tokens = np.fromstring(data, dtype=np.int64, sep=" ")
+            length = self._frame_length(tokens)
+            if length is None or len(tokens) < length:
+                continue
+            # the engine waits for our commands, anything after the frame
+            # means we lost track of where frames start
+            if len(tokens) > length:
+                raise SystemExit("{} ints after a {} int frame".format(len(tokens) - length, length))
+            return tokens
+
+    def parse(self, tokens):
+        # split a frame into the record arrays, returns the turn number
+        n_ships = 0
+        n_dropoffs = 0
+        i = 1
+        for _ in range(self.n_players):
+            pid, ships, dropoffs, halite = tokens[i:i + 4]
+            i += 4
+            self.halite[pid] = halite
+
+            self._ships = _reserve(self._ships, n_ships + ships)
+            block = self._ships[n_ships:n_ships + ships]
+            block[:, 0] = pid
+            block[:, 1:] = tokens[i:i + 4*ships].reshape(-1, 4)
+            n_ships += ships
+            i += 4*ships
+
+            self._dropoffs = _reserve(self._dropoffs, n_dropoffs + dropoffs)
+            block = self._dropoffs[n_dropoffs:n_dropoffs + dropoffs]
+            block[:, 0] = pid
+            block[:, 1:] = tokens[i:i + 3*dropoffs].reshape(-1, 3)
+            n_dropoffs += dropoffs
+            i += 3*dropoffs
+
+        self.ships = self._ships[:n_ships]
+        self.dropoffs = self._dropoffs[:n_dropoffs]
+        self.updates = tokens[i + 1:i + 1 + 3*int(tokens[i])].reshape(-1, 3)
+        return int(tokens[0])
+
+    # -------------------------------------------------------------------------
+    def update_frame(self):
+        game = self.game
+        game.turn_number = self.parse(self.read())
+        logging.info("=============== TURN {:03} ================".format(game.turn_number))
+
+        for player in game.players.values():
+            player.halite_amount = int(self.halite[player.id])
+            player._ships = {}
+            player._dropoffs = {}
+        for owner, id, x, y, halite in self.ships.tolist():
+            game.players[owner]._ships[id] = Ship(owner, id, Position(x, y), halite)
+        for owner, id, x, y in self.dropoffs.tolist():
+            game.players[owner]._dropoffs[id] = Dropoff(owner, id, Position(x, y))
+
+        game_map = game.game_map
+        cells = game_map._cells
+        for row in cells:
+            for cell in row:
+                cell.ship = None
+        for x, y, halite in self.updates.tolist():
+            cells[y][x].halite_amount = halite
+        game_map.frame_updates = self.updates
+
+        for player in game.players.values():
+            for ship in player.get_ships():
+                cells[ship.position.y][ship.position.x].mark_unsafe(ship)
+
+            game_map[player.shipyard.position].structure = player.shipyard
+            for dropoff in player.get_dropoffs():
+                game_map[dropoff.position].structure = dropoff
+
+# =============================================================================
+def _reserve(buffer, n):
+    # grow a record buffer to hold at least n rows
+    if n <= len(buffer):
+        return buffer
+    grown = np.zeros((max(n, 2 * len(buffer)), buffer.shape[1]), dtype=buffer.dtype)
+    grown[:len(buffer)] = buffer
+    return grown
+
+# =============================================================================
+# install - read every following frame of game through a FrameReader
+#
+# call once the init frame has been read by hlt.Game(). the reader is kept
+# on game.frame so later code can use the arrays directly
+# =============================================================================
+def install(game):
+    reader = FrameReader(game)
+    game.frame = reader
+    game.update_frame = reader.update_frame
+    game.game_map.frame_updates = None
+    return reader
@@ -0,0 +1,223 @@
+# Python 3.6
+
+import hlt
+
+from hlt.common import read_input
+from hlt.positionals import Position
+
+import numpy as np
+
+from Overmind.distance import DistanceTable
+from Overmind.flow import FlowField
+from Overmind.spatial import SpatialIndex
+from Overmind.threat import ThreatMap
+from Overmind.window import window_sum
+
+# size of the square blocks used for the per region halite totals
+REGION = 8
+
+# =============================================================================
+# watch_frames - make game_map._update remember the cells the engine changed
+#
+# this replaces GameMap._update on the instance with a copy that also keeps
+# the (x, y, halite) records of the frame in game_map.frame_updates
+# =============================================================================
+def watch_frames(game_map):
+    def _update():
+        for row in game_map._cells:
+            for cell in row:
+                cell.ship = None
+
+        updates = []
+        for _ in range(int(read_input())):
+            cell_x, cell_y, cell_energy = map(int, read_input().split())
+            game_map[Position(cell_x, cell_y)].halite_amount = cell_energy
+            updates.append((cell_x, cell_y, cell_energy))
+
+        game_map.frame_updates = updates
+
+    game_map._update = _update
+    game_map.frame_updates = None
+
+# =============================================================================
+# HaliteGrid - numpy snapshot of the map, refreshed once per update_frame()
+#
+# all layers are indexed [y, x] to match game_map._cells. the halite layer and
+# its totals are only touched for the cells reported in the frame
+# =============================================================================
+class HaliteGrid:
+    def __init__(self, game):
+        self.width = game.game_map.width
+        self.height = game.game_map.height
+        self.my_id = game.my_id
+        self.dist = DistanceTable(self.width, self.height)
+        self.ships = SpatialIndex(self.dist)
+
+        shape = (self.height, self.width)
+        self.halite = np.zeros(shape, dtype=np.int32)
+        self.occupied = np.zeros(shape, dtype=bool)
+        self.owner = np.full(shape, -1, dtype=np.int8)
+        self.ship_at = np.full(shape, -1, dtype=np.int32)
+        self.structure = np.full(shape, -1, dtype=np.int8)
+        self.total = 0
+        self.regions = np.zeros((-(-self.height // REGION), -(-self.width // REGION)), dtype=np.int64)
+        self._windows = {}
+        self._home = FlowField(self.width, self.height)
+        self._home_frame = False
+        self._threat = ThreatMap(self.dist)
+        self._threat_frame = False
+
+        if not hasattr(game.game_map, "frame_updates"):
+            watch_frames(game.game_map)
+
+        self.update(game)
+
+    def update(self, game):
+        game_map = game.game_map
+
+        updates = getattr(game_map, "frame_updates", None)
+        if updates is None:
+            # no diff for this frame, fall back to reading every cell
+            self._load(game_map)
+        elif len(updates):
+            self._apply(np.asarray(updates, dtype=np.int64).reshape(-1, 3))
+        game_map.frame_updates = None
+
+        self._index_ships(game)
+
+        # structure layer holds the owning player id, -1 if empty
+        self.structure.fill(-1)
+        for player in game.players.values():
+            self.structure[player.shipyard.position.y, player.shipyard.position.x] = player.id
+            for dropoff in player.get_dropoffs():
+                self.structure[dropoff.position.y, dropoff.position.x] = player.id
+
+        np.greater_equal(self.owner, 0, out=self.occupied)
+        self._home_frame = False
+        self._threat_frame = False
+
+    def _index_ships(self, game):
+        # every ship on the board as arrays indexed by ship id, plus the
+        # owner and ship id layers and the spatial index. the bulk frame
+        # reader already has the records, otherwise they are collected from
+        # the players
+        reader = getattr(game, "frame", None)
+        if reader is not None:
+            ships = reader.ships
+        else:
+            ships = np.array([(p.id, s.id, s.position.x, s.position.y, s.halite_amount)
+                              for p in game.players.values() for s in p.get_ships()], dtype=np.int64).reshape(-1, 5)
+
+        owners, ids, xs, ys, cargo = ships.T
+        size = int(ids.max()) + 1 if len(ids) else 0
+        self.ship_owner = np.full(size, -1, dtype=np.int8)
+        self.ship_x = np.zeros(size, dtype=np.int32)
+        self.ship_y = np.zeros(size, dtype=np.int32)
+        self.ship_cargo = np.zeros(size, dtype=np.int32)
+        self.ship_owner[ids] = owners
+        self.ship_x[ids] = xs
+        self.ship_y[ids] = ys
+        self.ship_cargo[ids] = cargo
+
+        self.owner.fill(-1)
+        self.ship_at.fill(-1)
+        self.owner[ys, xs] = owners
+        self.ship_at[ys, xs] = ids
+        self.ships.build(owners, ids, xs, ys)
+
+    def ship_owner_of(self, id):
+        # owning player of a ship this frame, -1 if it isn't on the board
+        if 0 <= id < len(self.ship_owner):
+            return int(self.ship_owner[id])
+        return -1
+
+    def _load(self, game_map):
+        self.halite[:] = [[game_map[Position(x, y)].halite_amount for x in range(self.width)] for y in range(self.height)]
+
+        self.total = int(self.halite.sum())
+        self.regions.fill(0)
+        np.add.at(self.regions, (np.arange(self.height)[:, None] // REGION, np.arange(self.width)[None, :] // REGION), self.halite)
+        self._windows.clear()
+
+    def _apply(self, updates):
+        # updates is an (n, 3) array of x, y, halite records
+        xs = updates[:, 0]
+        ys = updates[:, 1]
+        delta = updates[:, 2] - self.halite[ys, xs]
+
+        self.halite[ys, xs] = updates[:, 2]
+        self.total += int(delta.sum())
+        np.add.at(self.regions, (ys // REGION, xs // REGION), delta)
+        self._windows.clear()
+
+    def total_halite(self):
+        return self.total
+
+    def region_halite(self, pos):
+        return int(self.regions[pos.y // REGION, pos.x // REGION])
+
+    def window_sum(self, radius):
+        # sum of halite in the (2r+1)^2 box around every cell, cached for the frame
+        if radius not in self._windows:
+            self._windows[radius] = window_sum(self.halite, radius)
+
+        return self._windows[radius]
+
+    @property
+    def home(self):
+        # distance field toward our shipyard and dropoffs, around enemy ships
+        if not self._home_frame:
+            sources = self.structure == self.my_id
+            self._home.update(sources, self.occupied & (self.owner != self.my_id) & ~sources)
+            self._home_frame = True
+
+        return self._home
+
+    @property
+    def threat(self):
+        # enemy density, inspiration and nearest enemy layers for this frame
+        if not self._threat_frame:
+            self._threat.update(self)
+            self._threat_frame = True
+
+        return self._threat
+
+    def position(self, idx):
+        return Position(int(idx % self.width), int(idx // self.width))
+
+    def best_positions(self, values, n, spread=0):
+        # highest n cells of a [y, x] array, best first. with a spread each pick
+        # suppresses the cells within that many manhattan steps of it
+        flat = values.ravel()
+        n = min(n, flat.size)
+        if n <= 0:
+            return []
+
+        dy, dx = np.nonzero(self.dist.manhattan_table <= spread)
+
+        # every pick removes at most len(dy) cells, so n picks are always found
+        # in the top n*len(dy) cells
+        m = min(flat.size, n * len(dy))
+        top = np.sort(np.argpartition(-flat, m - 1)[:m]) if m < flat.size else np.arange(flat.size)
+        order = top[np.argsort(-flat[top], kind="stable")]
+
+        if spread == 0:
+            chosen = order[:n].tolist()
+        else:
+            suppressed = np.zeros(flat.size, dtype=bool)
+            chosen = []
+            for i in order.tolist():
+                if suppressed[i]:
+                    continue
+                chosen.append(i)
+                if len(chosen) == n:
+                    break
+                y, x = divmod(i, self.width)
+                suppressed[((y + dy) % self.height) * self.width + (x + dx) % self.width] = True
+
+            # the map is too small to spread them all out, reuse suppressed cells
+            if len(chosen) < n:
+                taken = set(chosen)
+                chosen += [i for i in order.tolist() if i not in taken][:n - len(chosen)]
+
+        return [self.position(i) for i in chosen]
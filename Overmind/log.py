@@ -0,0 +1,68 @@
+# Python 3.6
+
+import collections
+import logging
+import os
+
+# per ship / per path messages are only built when this is set. it is read
+# once at import so a disabled guard is a single global lookup
+HOT = bool(os.environ.get("OVERMIND_HOT_LOG"))
+
+# =============================================================================
+# RingBufferHandler - keep the most recent records in memory
+#
+# nothing is written until a record at flush_level or above arrives (errors,
+# including the turn timeout), flush() is called, or logging shuts down at the
+# end of the game. older records fall off the end of the buffer
+# =============================================================================
+class RingBufferHandler(logging.Handler):
+    def __init__(self, targets, capacity=5000, flush_level=logging.ERROR):
+        super().__init__()
+        self.targets = targets
+        self.records = collections.deque(maxlen=capacity)
+        self.flush_level = flush_level
+
+    def emit(self, record):
+        self.records.append(record)
+        if record.levelno >= self.flush_level:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            while self.records:
+                record = self.records.popleft()
+                for target in self.targets:
+                    if record.levelno >= target.level:
+                        target.handle(record)
+            for target in self.targets:
+                target.flush()
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        super().close()
+
+# =============================================================================
+# install - put the root logger's current handlers (the bot log file set up
+# by hlt.Game) behind a ring buffer
+#
+# this changes logging for the whole process, so only a bot's entry point
+# calls it, never code that also runs in process under Arena
+# =============================================================================
+def install(capacity=5000, level=logging.INFO):
+    root = logging.getLogger()
+    for handler in root.handlers:
+        if isinstance(handler, RingBufferHandler):
+            return handler
+
+    targets = root.handlers[:]
+    for handler in targets:
+        root.removeHandler(handler)
+
+    ring = RingBufferHandler(targets, capacity)
+    root.addHandler(ring)
+    root.setLevel(level)
+
+    return ring
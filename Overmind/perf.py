@@ -0,0 +1,101 @@
+# Python 3.6
+
+import atexit
+import json
+import time
+
+# =============================================================================
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+# =============================================================================
+class _Span:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+# =============================================================================
+# Profiler - per turn timing spans and counters written out as jsonl
+#
+# disabled by default, in which case span() hands back a shared no-op object
+# and lap()/count() return straight away. enable() starts writing one json line
+# per turn: {"turn": n, "total": s, "spans": {...}, "counters": {...}}
+#
+# laps split the turn into phases. spans time regions inside a phase and are
+# named "phase.region", their time is already part of the phase's lap
+# =============================================================================
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.spans = {}
+        self.counters = {}
+        self._file = None
+        self._turn_start = 0
+        self._last = 0
+
+    def enable(self, path):
+        self._file = open(path, "w")
+        self.enabled = True
+        atexit.register(self.close)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        self.enabled = False
+
+    def start_turn(self):
+        if self.enabled:
+            self._turn_start = self._last = time.perf_counter()
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def lap(self, name):
+        # charge the time since the previous lap (or the turn start) to name
+        if self.enabled:
+            now = time.perf_counter()
+            self.add(name, now - self._last)
+            self._last = now
+
+    def add(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0) + seconds
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def end_turn(self, turn):
+        if not self.enabled:
+            return
+
+        record = {
+            "turn": turn,
+            "total": time.perf_counter() - self._turn_start,
+            "spans": self.spans,
+            "counters": self.counters,
+        }
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+        self.spans = {}
+        self.counters = {}
+
+# shared instance, enabled by the director when OVERMIND_PROFILE is set
+profiler = Profiler()
@@ -0,0 +1,214 @@
+# Python 3.6
+
+import hlt
+
+from hlt.positionals import Position
+
+import heapq
+import logging
+
+from Overmind.perf import profiler
+
+# turns ahead a plan is kept free of our other ships
+WINDOW = 8
+
+# a plan that stops short of its goal is redone once this few steps are left
+REPLAN = WINDOW // 2
+
+# cap on the (turn, cell) states one search expands
+MAX_NODES = 1500
+
+# =============================================================================
+# ReservationPlanner - collision free multi turn paths for a group of ships
+#
+# a windowed cooperative A*: ships are planned one after another through
+# (turn, cell) space, every plan reserves the cells it occupies on each turn
+# of the window and later ships route around those reservations, waiting in
+# place when that is cheaper. a ship that reaches its goal inside the window
+# also holds the goal for the rest of it
+#
+# plans are kept between turns. a plan stays as long as its ship is where the
+# plan said it would be and its steps aren't blocked, and those plans are
+# reserved before anything new is planned, so ships that are on track are
+# never rerouted for newcomers. our ships without a plan are mostly mining
+# and block their cell for the whole window, enemy ships only for next turn.
+# plans never wait on our structures, the returning ships need them clear
+# =============================================================================
+class ReservationPlanner:
+    def __init__(self, width, height, dist, window=WINDOW):
+        self.width = width
+        self.height = height
+        self.dist = dist
+        self.window = window
+        self.plans = {}
+        self.table = {}
+
+    # -------------------------------------------------------------------------
+    def plan(self, game, grid, roles, budget=None):
+        # roles need id, seek_pos and seek_path. on return seek_path holds the
+        # ship's cell this turn followed by one cell per turn of the plan, or
+        # None for the ships that couldn't be planned. a target another of our
+        # ships is sitting on is dropped, seek_pos is set to None
+        me = game.me
+        turn = game.turn_number
+        w = self.width
+        self.table = {}
+
+        ships = {r.id: me.get_ship(r.id) for r in roles if me.has_ship(r.id)}
+        for id in [id for id in self.plans if id not in ships]:
+            del self.plans[id]
+
+        # our ships without a plan are mostly sitting on halite, they block
+        # their cell for the whole window. enemy ships only for next turn
+        parked = grid.owner == me.id
+        for ship in ships.values():
+            parked[ship.position.y, ship.position.x] = False
+        blocked = (parked | grid.occupied).ravel().tolist()
+        parked = parked.ravel().tolist()
+
+        # returning ships need our structures clear, plans only pass over them
+        home = (grid.structure == me.id).ravel().tolist()
+
+        # plans still on track keep their cells, the rest are planned in
+        # order of distance to their goal
+        with profiler.span("paths.keep"):
+            pending = []
+            for r in roles:
+                ship = ships.get(r.id)
+                if ship is None:
+                    continue
+                if parked[r.seek_pos.y * w + r.seek_pos.x]:
+                    # another of our ships is mining the target, pick a new one
+                    self.plans.pop(r.id, None)
+                    r.seek_pos = None
+                    r.seek_path = None
+                    continue
+                steps = self._current(r, ship, turn, blocked, parked)
+                if steps is None:
+                    pending.append((self.dist.manhattan(ship.position, r.seek_pos), r))
+                else:
+                    self._reserve(r.id, steps)
+                    r.seek_path = [Position(cell % w, cell // w) for _, cell in steps]
+
+        with profiler.span("paths.search"):
+            pending.sort(key=lambda p: p[0])
+            for _, r in pending:
+                if budget is not None and budget.expired():
+                    r.seek_path = None
+                    continue
+                ship = ships[r.id]
+                steps = self._search(r.id, ship.position, r.seek_pos, turn, blocked, parked, home)
+                if steps is None:
+                    self.plans.pop(r.id, None)
+                    r.seek_path = None
+                    continue
+                self.plans[r.id] = (r.seek_pos, steps)
+                self._reserve(r.id, steps)
+                r.seek_path = [Position(cell % w, cell // w) for _, cell in steps]
+                profiler.count("plans")
+
+    def _current(self, role, ship, turn, blocked, parked):
+        # the steps left of a ship's plan if it is still good, otherwise None
+        if role.id not in self.plans:
+            return None
+        goal, steps = self.plans[role.id]
+        steps = [s for s in steps if s[0] >= turn]
+        here = ship.position.y * self.width + ship.position.x
+        if goal != role.seek_pos or len(steps) < 2 or steps[0] != (turn, here):
+            return None
+
+        goal_cell = goal.y * self.width + goal.x
+        if steps[-1][1] != goal_cell and len(steps) <= REPLAN:
+            return None
+        if steps[1][1] != here and blocked[steps[1][1]]:
+            return None
+        if any(parked[cell] for _, cell in steps[1:]):
+            return None
+        for s in steps:
+            if self.table.get(s, role.id) != role.id:
+                return None
+
+        self.plans[role.id] = (goal, steps)
+        return steps
+
+    def _reserve(self, id, steps):
+        for s in steps:
+            self.table[s] = id
+
+        # hold the goal for the rest of the window once it is reached
+        last_turn, last_cell = steps[-1]
+        end = steps[0][0] + self.window
+        for t in range(last_turn + 1, end + 1):
+            self.table.setdefault((t, last_cell), id)
+
+    # -------------------------------------------------------------------------
+    def _search(self, id, start, goal, turn, blocked, parked, home):
+        # A* over (turn, cell) from start toward goal, returns [(turn, cell)]
+        # from this turn up to the goal or to the end of the window
+        w = self.width
+        h = self.height
+        manhattan = self.dist._manhattan
+        table = self.table
+        window = self.window
+
+        gx, gy = goal.x % w, goal.y % h
+        goal_cell = gy * w + gx
+        start_cell = (start.y % h) * w + start.x % w
+
+        def free(t, cell):
+            owner = table.get((turn + t, cell))
+            return owner is None or owner == id
+
+        def settled(t):
+            # the goal can be held from turn t to the end of the window
+            return all(free(u, goal_cell) for u in range(t, window + 1))
+
+        previous = {}
+        closed = set()
+        start_node = (0, start_cell)
+        leaf_nodes = [(manhattan[(gy - start.y) % h][(gx - start.x) % w], 0, start_cell)]
+        expanded = 0
+        best = None
+        while leaf_nodes:
+            _, neg_t, cell = heapq.heappop(leaf_nodes)
+            t = -neg_t
+            node = (t, cell)
+            if node in closed:
+                continue
+            closed.add(node)
+
+            if (cell == goal_cell and settled(t)) or (t == window and not home[cell]):
+                best = node
+                break
+
+            expanded += 1
+            if expanded > MAX_NODES:
+                break
+
+            x = cell % w
+            y = cell // w
+            for nx, ny in ((x, y), ((x + 1) % w, y), ((x - 1) % w, y), (x, (y + 1) % h), (x, (y - 1) % h)):
+                n = ny * w + nx
+                if n == cell and home[n]:
+                    continue
+                child = (t + 1, n)
+                if child in closed or not free(t + 1, n):
+                    continue
+                if n != cell and (parked[n] or (t == 0 and blocked[n])):
+                    continue
+                if child not in previous:
+                    previous[child] = node
+                    heapq.heappush(leaf_nodes, (t + 1 + manhattan[(gy - ny) % h][(gx - nx) % w], -(t + 1), n))
+
+        profiler.count("plan_expanded", expanded)
+        if best is None:
+            logging.info("No plan for ship {} from {} to {}".format(id, start, goal))
+            return None
+
+        steps = []
+        node = best
+        while node != start_node:
+            steps.append((turn + node[0], node[1]))
+            node = previous[node]
+        steps.append((turn, start_cell))
+        return steps[::-1]
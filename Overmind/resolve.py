@@ -0,0 +1,158 @@
+# Python 3.6
+
+import hlt
+
+from hlt import constants
+from hlt.positionals import Direction
+
+import logging
+
+from Overmind.perf import profiler
+
+# cell offsets of the move command letters
+OFFSETS = {"n": (0, -1), "s": (0, 1), "e": (1, 0), "w": (-1, 0), "o": (0, 0)}
+
+# =============================================================================
+def is_passable(game, pos):
+    # free, or held by one of our ships that hasn't moved off it yet. the
+    # cell may still be taken if that ship ends up staying, resolve() then
+    # holds back whoever moved in
+    other = game.game_map[pos].ship
+    return other is None or (other.owner == game.me.id and other.position == pos)
+
+def navigate(game, ship, destination):
+    # naive_navigate that treats cells our own ships are leaving as free
+    game_map = game.game_map
+    for direction in game_map.get_unsafe_moves(ship.position, destination):
+        target_pos = game_map.normalize(ship.position.directional_offset(direction))
+        if is_passable(game, target_pos):
+            game_map[target_pos].mark_unsafe(ship)
+            return direction
+
+    return Direction.Still
+
+# =============================================================================
+# resolve - final pass over the turn's commands so none of our ships collide
+#
+# every ship ranks the cells it could end the turn on: where its command
+# sends it, then, if its role has a goal, its other moves toward the goal
+# onto cells without an enemy ship, then its own cell. a ship that can't pay
+# to move only has its own cell, one that was told to stay keeps it. ships
+# are settled in command order and take the first cell on their list nobody
+# has claimed. a ship staying put always keeps its cell, so a ship it pushes
+# out goes on down its own list, which may end in staying and push out the
+# ship that moved onto that cell, and so on down the chain. a ship never goes
+# back up its list, so the pass is linear in the fleet. swaps and cycles need
+# no help, their ships all end on different cells
+#
+# a spawn is dropped if a ship ends the turn on the shipyard. may_crash(id)
+# lets a ship pile onto one of our structures on purpose, at the end of the
+# game. goal(id) is where the ship is headed this turn, or None
+# =============================================================================
+def resolve(game, commands, may_crash=None, goal=None):
+    me = game.me
+    game_map = game.game_map
+    w = game_map.width
+    h = game_map.height
+
+    moves = {}
+    others = []
+    for cmd in commands:
+        parts = cmd.split()
+        if parts[0] == "m" and len(parts) == 3 and parts[2] in OFFSETS:
+            moves[int(parts[1])] = cmd
+        else:
+            others.append(cmd)
+    leaving = {int(cmd.split()[1]) for cmd in others if cmd.startswith("c ")}
+
+    home = {(me.shipyard.position.x, me.shipyard.position.y)}
+    home.update((d.position.x, d.position.y) for d in me.get_dropoffs())
+
+    # where each ship is and where its command takes it, if it can pay
+    order = {id: i for i, id in enumerate(moves)}
+    ships = sorted((s for s in me.get_ships() if s.id not in leaving), key=lambda s: order.get(s.id, len(order)))
+    own = {}
+    ranked = {}
+    for s in ships:
+        x, y = s.position.x, s.position.y
+        own[s.id] = (x, y)
+        ranked[s.id] = [own[s.id]]
+        if s.id in moves and game_map[s.position].halite_amount // constants.MOVE_COST_RATIO <= s.halite_amount:
+            dx, dy = OFFSETS[moves[s.id].split()[2]]
+            if (dx, dy) != (0, 0):
+                ranked[s.id] = [((x + dx) % w, (y + dy) % h), own[s.id]]
+
+    rank = {s.id: 0 for s in ships}
+    def next_cell(id):
+        # the rest of the list is only ranked once a ship loses its first cell
+        if rank[id] == 0 and goal is not None:
+            target = goal(id)
+            if target is not None:
+                ranked[id][1:-1] = _alternatives(game, me.get_ship(id), target, ranked[id][0])
+        rank[id] += 1
+
+    claim = {}
+    final = {}
+    held = 0
+    rerouted = 0
+    for s in ships:
+        id = s.id
+        while True:
+            cell = ranked[id][rank[id]]
+            other = claim.get(cell)
+            if other is None or (cell in home and may_crash is not None and may_crash(id)):
+                claim.setdefault(cell, id)
+                final[id] = cell
+                break
+            if cell != own[id]:
+                # the cell is taken, try the next one down the list
+                next_cell(id)
+                continue
+            # we are staying, the ship that moved onto our cell moves on
+            claim[cell] = id
+            final[id] = cell
+            id = other
+            next_cell(id)
+
+    commanded = []
+    for s in ships:
+        cell = final[s.id]
+        if cell == own[s.id]:
+            commanded.append(s.stay_still())
+            held += len(ranked[s.id]) > 1
+        elif rank[s.id] == 0:
+            commanded.append(moves[s.id])
+        else:
+            commanded.append(s.move(_direction(own[s.id], cell, w, h)))
+            rerouted += 1
+
+    yard = (me.shipyard.position.x, me.shipyard.position.y)
+    for cmd in others:
+        if cmd == "g" and yard in claim:
+            logging.info("Spawn held back, a ship is staying on the shipyard")
+            continue
+        commanded.append(cmd)
+
+    if held:
+        profiler.count("moves_held", held)
+    if rerouted:
+        profiler.count("moves_rerouted", rerouted)
+    return commanded
+
+def _alternatives(game, ship, target, first):
+    # the ship's other moves toward target, leaving out cells with an enemy
+    # ship. stepping sideways or back costs halite and loses more than it gains
+    game_map = game.game_map
+    cells = []
+    for direction in game_map.get_unsafe_moves(ship.position, target):
+        p = game_map.normalize(ship.position.directional_offset(direction))
+        other = game_map[p].ship
+        if (other is None or other.owner == game.me.id) and (p.x, p.y) != first:
+            cells.append((p.x, p.y))
+    return cells
+
+def _direction(start, end, w, h):
+    # the move command letter that takes start to the neighbouring end
+    for letter, (dx, dy) in OFFSETS.items():
+        if ((start[0] + dx) % w, (start[1] + dy) % h) == end:
+            return letter
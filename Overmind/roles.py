@@ -8,7 +8,13 @@ from hlt.positionals import Direction
 import logging
 import random
 
+from Overmind.resolve import navigate
 from Overmind.tools import *
+import Overmind.log as LOG
+
+# turns in a row a seeker may be blocked or left without a plan before it
+# drops its target
+SEEK_PATIENCE = 2
 
 # =============================================================================
 # blocker class - just navigate to a locatation and stay there
@@ -18,10 +24,13 @@ class blocker:
         self.id = id
         self.target = None
         self.path = None
+        self.goal = None
 
-    def update(self, ship, game):
+    def update(self, ship, game, grid):
+        self.goal = self.target
         if self.target:
-            logging.info("current ship {} path: {}".format(self.id, self.path))
+            if LOG.HOT:
+                logging.info("current ship {} path: {}".format(self.id, self.path))
             if self.path:
                 # See if the last move was successful
                 if ship.position == self.path[0]:
@@ -40,9 +49,10 @@ class blocker:
                 
             else:
                 # acquire a new path
-                logging.info("Getting Path for Ship: {} from {} to {}".format(self.id, ship.position, self.target))
-                self.path = get_path(game, ship.position, self.target)
-                if self.path:
+                if LOG.HOT:
+                    logging.info("Getting Path for Ship: {} from {} to {}".format(self.id, ship.position, self.target))
+                self.path = get_path(game, grid, ship.position, self.target)
+                if LOG.HOT and self.path:
                     logging.info(self.path)
                 cmd = ship.stay_still()
                 
@@ -58,16 +68,20 @@ class destroyer:
         self.target_id = target_id
         self.idle = False
         self.path = None
+        self.goal = None
         
-    def update(self, ship, game):
+    def update(self, ship, game, grid):
         # make sure target ship still exists
-        t_ship = get_ship_from_id(game, self.target_id)
+        t_ship = get_ship_from_id(game, grid, self.target_id)
+        self.goal = t_ship.position if t_ship else None
         if t_ship:
             # make sure we have a path
             if not self.path or t_ship.position not in self.path:
-                self.path = get_path(game, ship.position, t_ship.position, unsafe=True)
+                # around our own ships, onto the target
+                self.path = get_path(game, grid, ship.position, t_ship.position, crash=True)
             
-            logging.info("destroyer path: {}".format(self.path))
+            if LOG.HOT:
+                logging.info("destroyer path: {}".format(self.path))
             if self.path:
                 unsafe_moves = game.game_map.get_unsafe_moves(ship.position, self.path[0])
                 if len(self.path) == 1:
@@ -78,7 +92,8 @@ class destroyer:
                 else:
                     move_dir = game.game_map.naive_navigate(ship, self.path[0]) 
 
-                logging.info("move dir: {}, unsafe_moves: {}".format(move_dir, unsafe_moves))
+                if LOG.HOT:
+                    logging.info("move dir: {}, unsafe_moves: {}".format(move_dir, unsafe_moves))
                 if move_dir == (0, 0):
                     # something is blocking the path, we need a new one
                     self.path = None
@@ -109,41 +124,54 @@ class gatherer:
         self.seek_pos = None
         self.seek_path = None
         self.idle_count = 0
+        self.blocked_count = 0
+        self.goal = None
     
-    def update(self, ship, game):
+    def update(self, ship, game, grid):
         # if we are getting close to the end of the game, make sure
         # to return resources before the time is up
-        if game.turn_number >= constants.MAX_TURNS - game.game_map.calculate_distance(ship.position, game.me.shipyard.position) - (4 + ((game.game_map.width - 32)/2)):
+        if game.turn_number >= constants.MAX_TURNS - grid.dist.manhattan(ship.position, game.me.shipyard.position) - (4 + ((game.game_map.width - 32)/2)):
             self.state = gatherer.state.COLLAPSE
         
         if self.state == gatherer.state.GATHER:
-            cmd = self.gather(ship, game)
+            cmd = self.gather(ship, game, grid)
         elif self.state == gatherer.state.RETURN:
-            cmd = self.store(ship, game)
+            cmd = self.store(ship, game, grid)
         elif self.state == gatherer.state.SEEK:
-            cmd = self.seek(ship, game)
+            cmd = self.seek(ship, game, grid)
         elif self.state == gatherer.state.COLLAPSE:
-            cmd = self.collapse(ship, game)
+            cmd = self.collapse(ship, game, grid)
         else:
             # invalid state
             self.state = gatherer.state.GATHER
             cmd = ship.stay_still()
             
+        self.goal = self._goal(ship, game, grid)
         return cmd
         
-    def seek(self, ship, game):
+    def _goal(self, ship, game, grid):
+        # where resolve() should send us if our move is taken, a gatherer
+        # that is mining is better off staying
+        if self.state == gatherer.state.SEEK:
+            return self.seek_pos
+        if self.state in (gatherer.state.RETURN, gatherer.state.COLLAPSE):
+            homes = [game.me.shipyard.position] + [d.position for d in game.me.get_dropoffs()]
+            return min(homes, key=lambda p: grid.dist.manhattan(ship.position, p))
+        return None
+        
+    def seek(self, ship, game, grid):
         if self.seek_pos is None:
             self.state = gatherer.state.GATHER
-            cmd = self.gather(ship, game)
+            cmd = self.gather(ship, game, grid)
         else:
             if ship.is_full:
                 self.state = gatherer.state.RETURN
-                cmd = self.store(ship, game)
+                cmd = self.store(ship, game, grid)
             elif ship.position == self.seek_pos:
                 self.seek_pos = None
                 self.seek_path = None
                 self.state = gatherer.state.GATHER
-                cmd = self.gather(ship, game)
+                cmd = self.gather(ship, game, grid)
             elif self._is_efficient_to_seek(ship, game):
                 if self.seek_path:
                     # See if the last move was successful
@@ -152,47 +180,74 @@ class gatherer:
                     
                     # move to the next position
                     cmd = self._seek_move(ship, game)
+                elif grid.home.distance(ship.position) == 0:
+                    # no plan, and the ships around our structure can't make
+                    # way while they wait to drop off. swap with the ship
+                    # coming in if there is one, else step toward the target
+                    # anyway, resolve() holds us if nobody makes room
+                    incoming = game.game_map[ship.position].ship
+                    if incoming is not None and incoming.id != ship.id and incoming.owner == ship.owner:
+                        cmd = ship.move(game.game_map.get_unsafe_moves(ship.position, incoming.position)[0])
+                    else:
+                        move_dir = navigate(game, ship, self.seek_pos)
+                        cmd = ship.stay_still() if move_dir == (0, 0) else ship.move(move_dir)
                 else:
-                    # acquire a new path
-                    logging.info("Getting Path for Ship: {} from {} to {}".format(self.id, ship.position, self.seek_pos))
-                    self.seek_path = get_path(game, ship.position, self.seek_pos)
-                    if self.seek_path:
-                        logging.info(self.seek_path)
-                    
-                    # move to the next position
-                    cmd = self._seek_move(ship, game)
+                    # the planner ran out of time or found no path, wait for
+                    # next turn's plan instead of searching the map here
+                    if LOG.HOT:
+                        logging.info("No plan for Ship: {} from {} to {}".format(self.id, ship.position, self.seek_pos))
+                    cmd = self._blocked(ship, game)
             else:
                 cmd = ship.stay_still()
         
         return cmd
         
     def _seek_move(self, ship, game):
-        if self.seek_path:
-            move_dir = game.game_map.naive_navigate(ship, self.seek_path[0])
+        if self.seek_path and self.seek_path[0] == ship.position:
+            # the plan has us wait here a turn
+            cmd = ship.stay_still()
+        elif self.seek_path:
+            move_dir = navigate(game, ship, self.seek_path[0])
             if move_dir == (0, 0):
-                # something is blocking the path, get a new one
-                self.seek_pos = None
-                self.seek_path = None
-                cmd = self._random_move(game, ship)
-                logging.info("seeker {} moving randomly {}".format(ship.id, cmd))
+                # something is blocking the path
+                cmd = self._blocked(ship, game)
             else:
                 cmd = ship.move(move_dir)
+                self.blocked_count = 0
         else:
             cmd = self._random_move(game, ship)
             
         return cmd
         
-    def gather(self, ship, game):
+    def _blocked(self, ship, game):
+        # hold the target and get a new path next turn. give up on it if that
+        # keeps happening
+        self.seek_path = None
+        self.blocked_count += 1
+        if self.blocked_count >= SEEK_PATIENCE:
+            self.seek_pos = None
+            self.blocked_count = 0
+            cmd = self._random_move(game, ship)
+            if LOG.HOT:
+                logging.info("seeker {} moving randomly {}".format(ship.id, cmd))
+        else:
+            cmd = ship.stay_still()
+            
+        return cmd
+        
+    def gather(self, ship, game, grid):
         if ship.is_full:
             self.state = gatherer.state.RETURN
-            cmd = self.store(ship, game)
+            cmd = self.store(ship, game, grid)
         else:
             # gather - Move toward the cell with most halite
             value = 0
             next_pos = None
             
+            threat = grid.threat
             for p in ship.position.get_surrounding_cardinals():
-                if not game.game_map[p].is_occupied:
+                # next to an enemy ship it could ram us and take the cargo
+                if not game.game_map[p].is_occupied and threat.distance(p) > 1:
                     v = game.game_map[p].halite_amount
                     if v > value:
                         value = v
@@ -210,20 +265,22 @@ class gatherer:
                 
         return cmd
         
-    def store(self, ship, game):
-        if ship.position == game.me.shipyard.position:
+    def store(self, ship, game, grid):
+        if grid.home.distance(ship.position) == 0:
             self.state = gatherer.state.SEEK
-            cmd = self.seek(ship, game)
+            cmd = self.seek(ship, game, grid)
         else:
-            # go home
+            # go home, following the shipyard flow field
             if game.game_map[ship.position].halite_amount < constants.MAX_HALITE / 10 or ship.is_full:
-                move_dir = game.game_map.naive_navigate(ship, game.me.shipyard.position)
+                move_dir = grid.home.step(game, ship)
                 if move_dir == (0,0):
                     self.idle_count += 1
-                    if self.idle_count == 3:
-                        cmd = self._random_move(game, ship)
-                    else:
-                        cmd = ship.stay_still()
+                    if self.idle_count >= 3:
+                        # been stuck a while, allow a side step around the block
+                        move_dir = grid.home.step(game, ship, slack=1)
+                        
+                if move_dir == (0,0):
+                    cmd = ship.stay_still()
                 else:
                     cmd = ship.move(move_dir)
                     self.idle_count = 0
@@ -232,18 +289,15 @@ class gatherer:
                 
         return cmd
         
-    def collapse(self, ship, game):
-        if ship.position == game.me.shipyard.position:
+    def collapse(self, ship, game, grid):
+        if grid.home.distance(ship.position) == 0:
             cmd = ship.stay_still()
         else:
-            move_dir = game.game_map.naive_navigate(ship, game.me.shipyard.position)
+            # crashing into our own shipyard is fine at the end of the game
+            move_dir = grid.home.step(game, ship, crash=True)
             
             if move_dir == (0,0):
-                if game.game_map.calculate_distance(ship.position, game.me.shipyard.position) == 1:
-                    unsafe_moves = game.game_map.get_unsafe_moves(ship.position, game.me.shipyard.position)
-                    cmd = ship.move(unsafe_moves[0])
-                else:
-                    cmd = ship.stay_still()
+                cmd = ship.stay_still()
             else:
                 cmd = ship.move(move_dir)
                 
@@ -269,12 +323,14 @@ class gatherer:
         value_in_next_location = game.game_map[next_pos].halite_amount * 0.25
         value_in_current_location = game.game_map[ship.position].halite_amount * 0.25
         
-        logging.info("Cost to move: {}".format(cost_to_move))
-        logging.info("Value in next: {}".format(value_in_next_location))
+        if LOG.HOT:
+            logging.info("Cost to move: {}".format(cost_to_move))
+            logging.info("Value in next: {}".format(value_in_next_location))
         if cost_to_move <= ship.halite_amount and (value_in_next_location > (value_in_current_location + 3 * cost_to_move)):
             move = True
         
-        logging.info("MOVE? : {}".format(move))
+        if LOG.HOT:
+            logging.info("MOVE? : {}".format(move))
         return move
         
     def _random_move(self, game, ship):
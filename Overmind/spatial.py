@@ -0,0 +1,117 @@
+# Python 3.6
+
+import numpy as np
+
+# cells per side of a bucket, the last bucket on an axis may be one smaller
+BUCKET = 8
+
+# =============================================================================
+# SpatialIndex - ships bucketed on a coarse grid that wraps like the map
+#
+# build() drops every ship into its bucket in one pass, so rebuilding it each
+# frame is O(n). queries walk rings of buckets outward from the query cell and
+# stop once no unvisited bucket can hold anything closer. every bucket is at
+# least min_side cells wide, so a ship r rings out is at least
+# (r - 1) * min_side + 1 cells away on one axis, whichever way round the torus
+#
+# distances come from the grid's DistanceTable, "euclidean" or "manhattan".
+# equal distances are broken by the order the ships were given to build(),
+# which is the frame order. where(id) and owner filter the candidates
+# =============================================================================
+class SpatialIndex:
+    def __init__(self, dist, bucket=BUCKET):
+        self.dist = dist
+        self.width = dist.width
+        self.height = dist.height
+
+        # bucket sizes differ by at most one cell so min_side is the real bound
+        self.nbx = max(1, self.width // bucket)
+        self.nby = max(1, self.height // bucket)
+        self.min_side = min(self.width // self.nbx, self.height // self.nby)
+        self._bx = (np.arange(self.width) * self.nbx // self.width).tolist()
+        self._by = (np.arange(self.height) * self.nby // self.height).tolist()
+        self._max_ring = max(self.nbx, self.nby) // 2
+        self._tables = {"euclidean": dist._euclidean, "manhattan": dist._manhattan}
+
+        self._buckets = [[] for _ in range(self.nbx * self.nby)]
+        self._rings = {}
+
+    def build(self, owners, ids, xs, ys):
+        # arrays or lists of equal length, one entry per ship
+        buckets = [[] for _ in range(self.nbx * self.nby)]
+        bx = self._bx
+        by = self._by
+        nbx = self.nbx
+        for order, (owner, id, x, y) in enumerate(zip(_list(owners), _list(ids), _list(xs), _list(ys))):
+            buckets[by[y] * nbx + bx[x]].append((order, id, x, y, owner))
+        self._buckets = buckets
+
+    # -------------------------------------------------------------------------
+    def _ring(self, bx, by, r):
+        # bucket keys r rings out from (bx, by), each key once
+        key = (bx, by, r)
+        if key not in self._rings:
+            keys = []
+            for dy in range(-r, r + 1):
+                for dx in range(-r, r + 1):
+                    if max(abs(dx), abs(dy)) == r:
+                        keys.append(((by + dy) % self.nby) * self.nbx + (bx + dx) % self.nbx)
+            self._rings[key] = list(dict.fromkeys(keys))
+        return self._rings[key]
+
+    def _bound(self, r):
+        # no ship r or more rings out is closer than this
+        return 0 if r == 0 else (r - 1) * self.min_side + 1
+
+    def _scan(self, pos, keep, where, owner, metric, radius=None):
+        # (dist, order, id) of matching ships, ring by ring until keep(found, r)
+        # says the rest can't matter
+        table = self._tables[metric]
+        w = self.width
+        h = self.height
+        px = pos.x % w
+        py = pos.y % h
+        bx = self._bx[px]
+        by = self._by[py]
+
+        found = []
+        seen = set()
+        for r in range(self._max_ring + 1):
+            if not keep(found, r):
+                break
+            for key in self._ring(bx, by, r):
+                if key in seen:
+                    continue
+                seen.add(key)
+                for order, id, x, y, o in self._buckets[key]:
+                    if owner is not None and o != owner:
+                        continue
+                    d = table[(y - py) % h][(x - px) % w]
+                    if radius is not None and d > radius:
+                        continue
+                    if where is not None and not where(id):
+                        continue
+                    found.append((d, order, id))
+
+        found.sort()
+        return found
+
+    # -------------------------------------------------------------------------
+    def nearest(self, pos, k=1, where=None, owner=None, metric="manhattan"):
+        # ids of the k closest matching ships, closest first
+        def keep(found, r):
+            if len(found) < k:
+                return True
+            found.sort()
+            return found[k - 1][0] >= self._bound(r)
+
+        return [id for _, _, id in self._scan(pos, keep, where, owner, metric)[:k]]
+
+    def within(self, pos, radius, where=None, owner=None, metric="manhattan"):
+        # ids of the matching ships at most radius away, closest first
+        keep = lambda found, r: self._bound(r) <= radius
+        return [id for _, _, id in self._scan(pos, keep, where, owner, metric, radius)]
+
+# =============================================================================
+def _list(values):
+    return values.tolist() if isinstance(values, np.ndarray) else list(values)
@@ -7,22 +7,56 @@ from hlt.positionals import Direction
 
 import logging
 
+import numpy as np
+
+from Overmind.budget import atomic
+from Overmind.fleet import Fleet
+from Overmind.reserve import ReservationPlanner
 from Overmind.tools import *
 from Overmind.roles import *
+from Overmind.perf import profiler
+import Overmind.log as LOG
+
+# offsets from our shipyard, on both axes, where an enemy ship gets a destroyer
+THREAT_OFFSETS = np.arange(-2, 3)
 
 # =============================================================================
 class strategy:
-    def update():
+    def update(self, game, grid, budget, command_queue):
         logging.error("FAILED TO IMPLEMENT UPDATE METHOD IN STRATEGY SUBCLASS")
-        return []
+
+    def plan_seekers(self, game, grid, budget):
+        # plan every seeker's path around the others, ships on track keep theirs.
+        # a returning ship that made it home starts seeking this turn
+        me = game.me
+        def seeking(g):
+            if g.state == gatherer.state.RETURN:
+                return grid.home.distance(me.get_ship(g.id).position) == 0
+            return g.state == gatherer.state.SEEK
+        seekers = self.fleet.of(gatherer, lambda g: g.seek_pos is not None and seeking(g))
+        if seekers and not budget.expired():
+            # the planner checks the budget itself
+            with atomic():
+                self.planner.plan(game, grid, seekers, budget)
+
+    def may_crash(self, id):
+        # collapsing gatherers pile into our structures at the end of the game
+        role = self.fleet.get(id)
+        return type(role) is gatherer and role.state == gatherer.state.COLLAPSE
+
+    def goal(self, id):
+        # where the ship's role is headed this turn, resolve() ranks the
+        # ship's other moves by it
+        role = self.fleet.get(id)
+        return role.goal if role is not None else None
         
 # =============================================================================
 class camp_enemy_base(strategy):
-    def __init__(self, game):
-        self.MAX_SHIPS = calc_max_ships(game)
-        self.gs = []
-        self.fus = []
+    def __init__(self, game, grid):
+        self.MAX_SHIPS = calc_max_ships(game, grid)
+        self.fleet = Fleet()
         self.stop_spawning = False
+        self.planner = ReservationPlanner(grid.width, grid.height, grid.dist)
         
         # set targets to surround other players base
         for p in game.players:
@@ -33,88 +67,75 @@ class camp_enemy_base(strategy):
         self.targets = player.shipyard.position.get_surrounding_cardinals()
         logging.info(self.targets)
         
-    def update(self, game):
+    def new_role(self, ship):
+        # the first ships gather, then up to four block the enemy base
+        if self.fleet.count(gatherer) > 6 and self.fleet.count(blocker) < 4:
+            return blocker(ship.id)
+        return gatherer(ship.id)
+        
+    def update(self, game, grid, budget, command_queue):
         # You extract player metadata and the updated map metadata here for convenience.
         me = game.me
         game_map = game.game_map
         
-        # A command queue holds all the commands you will run this turn. You build this list up and submit it at the
-        #   end of the turn.
-        command_queue = []
+        # The command queue belongs to the director. Commands are appended as they are built so the ones
+        #   made before a hard deadline still go out.
         
-        # remove sunk ships
-        for g in self.gs:
-            if not me.has_ship(g.id):
-                self.gs.remove(g)
-        for f in self.fus:
-            if not me.has_ship(f.id):
-                self.fus.remove(f)
-                
-        # get ships with no roles
-        roleless = []
-        for s in me.get_ships():
-            all_ships = self.gs + self.fus
-            if s.id not in [x.id for x in all_ships]:
-                roleless.append(s)
-        
-        # assign new roles
-        logging.info("Roleless: {}".format(roleless))
-        while roleless:
-            s = roleless[0]
-            if len(self.gs) > 6 and len(self.fus) < 4:
-                self.fus.append(blocker(s.id))
-            else:
-                self.gs.append(gatherer(s.id))
-            roleless.remove(s)
+        # drop sunk ships and give new ships a role
+        self.fleet.reconcile(me.get_ships(), self.new_role)
         
-        # look for ships to add
-        # for s in me.get_ships():
-            # if s.id not in [x.id for x in self.gs]:
-                # self.gs.append(gatherer(s.id))
-
         # update gatherers
-        seekless = [x for x in self.gs if x.seek_pos is None]
-        if seekless:
-            t = get_targets(game, len(seekless))
+        gs = self.fleet.of(gatherer)
+        seekless = [x for x in gs if x.seek_pos is None]
+        if seekless and not budget.expired():
+            t = get_targets(game, grid, len(seekless))
             tidx = 0
             for seekship in seekless:
                 seekship.seek_pos = t[tidx]
                 tidx += 1
+        self.plan_seekers(game, grid, budget)
         
-        for g in self.gs:
+        for g in gs:
+            if budget.expired():
+                break
             g_ship = me.get_ship(g.id)
-            command_queue.append(g.update(g_ship, game))
+            with atomic():
+                command_queue.append(g.update(g_ship, game, grid))
 
 
         # update fu-ers
-        for f in self.fus:
+        fus = self.fleet.of(blocker)
+        taken = [f.target for f in fus if f.target is not None]
+        for f in fus:
+            if budget.expired():
+                break
             if not f.target and self.targets:
                 logging.info("Acquiring target")
                 for t in self.targets:
-                    if t not in [x.target for x in self.fus if x.target is not None]:
+                    if t not in taken:
                         f.target = t
+                        taken.append(t)
                         logging.info("new target assigned: {}".format(t))
                         break
             fu_ship = me.get_ship(f.id)
-            command_queue.append(f.update(fu_ship, game))
+            with atomic():
+                command_queue.append(f.update(fu_ship, game, grid))
 
         # If the game is in the first 200 turns and you have enough halite, spawn a ship.
         # Don't spawn a ship if you currently have a ship at port, though - the ships will collide.
         if game.turn_number <= (constants.MAX_TURNS - GAP.BUILD_FREEZE) and me.halite_amount >= constants.SHIP_COST and not game_map[me.shipyard].is_occupied and len(me.get_ships()) < self.MAX_SHIPS and not self.stop_spawning:
-            if (get_total_halite(game) > 50000):
+            if (get_total_halite(grid) > 50000):
                 command_queue.append(me.shipyard.spawn())
             else:
                 self.stop_spawning = True
 
-        return command_queue
-
 # =============================================================================
 class camp_enemy_base_4p(strategy):
-    def __init__(self, game):
-        self.MAX_SHIPS = calc_max_ships(game)
-        self.gs = []
-        self.fus = []
+    def __init__(self, game, grid):
+        self.MAX_SHIPS = calc_max_ships(game, grid)
+        self.fleet = Fleet()
         self.stop_spawning = False
+        self.planner = ReservationPlanner(grid.width, grid.height, grid.dist)
         
         # set targets to camp on all other bases
         self.targets = []
@@ -124,187 +145,163 @@ class camp_enemy_base_4p(strategy):
                 
         logging.info(self.targets)
         
-    def update(self, game):
+    def new_role(self, ship):
+        # the first ships gather, then one blocker per enemy base
+        if self.fleet.count(gatherer) > 6 and self.fleet.count(blocker) < len(self.targets):
+            return blocker(ship.id)
+        return gatherer(ship.id)
+        
+    def update(self, game, grid, budget, command_queue):
         # You extract player metadata and the updated map metadata here for convenience.
         me = game.me
         game_map = game.game_map
         
-        # A command queue holds all the commands you will run this turn. You build this list up and submit it at the
-        #   end of the turn.
-        command_queue = []
+        # The command queue belongs to the director. Commands are appended as they are built so the ones
+        #   made before a hard deadline still go out.
         
-        # remove sunk ships
-        for g in self.gs:
-            if not me.has_ship(g.id):
-                self.gs.remove(g)
-        for f in self.fus:
-            if not me.has_ship(f.id):
-                self.fus.remove(f)
-                
-        # get ships with no roles
-        roleless = []
-        for s in me.get_ships():
-            all_ships = self.gs + self.fus
-            if s.id not in [x.id for x in all_ships]:
-                roleless.append(s)
-        
-        # assign new roles
-        logging.info("Roleless: {}".format(roleless))
-        while roleless:
-            s = roleless[0]
-            if len(self.gs) > 6 and len(self.fus) < len(self.targets):
-                self.fus.append(blocker(s.id))
-            else:
-                self.gs.append(gatherer(s.id))
-            roleless.remove(s)
+        # drop sunk ships and give new ships a role
+        self.fleet.reconcile(me.get_ships(), self.new_role)
         
-        # look for ships to add
-        # for s in me.get_ships():
-            # if s.id not in [x.id for x in self.gs]:
-                # self.gs.append(gatherer(s.id))
-
         # update gatherers
-        seekless = [x for x in self.gs if x.seek_pos is None]
-        if seekless:
-            t = get_targets(game, len(seekless))
+        gs = self.fleet.of(gatherer)
+        seekless = [x for x in gs if x.seek_pos is None]
+        if seekless and not budget.expired():
+            t = get_targets(game, grid, len(seekless))
             tidx = 0
             for seekship in seekless:
                 seekship.seek_pos = t[tidx]
                 tidx += 1
+        self.plan_seekers(game, grid, budget)
         
-        for g in self.gs:
+        for g in gs:
+            if budget.expired():
+                break
             g_ship = me.get_ship(g.id)
-            command_queue.append(g.update(g_ship, game))
+            with atomic():
+                command_queue.append(g.update(g_ship, game, grid))
 
 
         # update fu-ers
-        for f in self.fus:
+        fus = self.fleet.of(blocker)
+        taken = [f.target for f in fus if f.target is not None]
+        for f in fus:
+            if budget.expired():
+                break
             if not f.target and self.targets:
                 logging.info("Acquiring target")
                 for t in self.targets:
-                    if t not in [x.target for x in self.fus if x.target is not None]:
+                    if t not in taken:
                         f.target = t
+                        taken.append(t)
                         logging.info("new target assigned: {}".format(t))
                         break
             fu_ship = me.get_ship(f.id)
-            command_queue.append(f.update(fu_ship, game))
+            with atomic():
+                command_queue.append(f.update(fu_ship, game, grid))
 
         # If the game is in the first 200 turns and you have enough halite, spawn a ship.
         # Don't spawn a ship if you currently have a ship at port, though - the ships will collide.
         if game.turn_number <= (constants.MAX_TURNS - GAP.BUILD_FREEZE) and me.halite_amount >= constants.SHIP_COST and not game_map[me.shipyard].is_occupied and len(me.get_ships()) < self.MAX_SHIPS and not self.stop_spawning:
-            if (get_total_halite(game) > 50000):
+            if (get_total_halite(grid) > 50000):
                 command_queue.append(me.shipyard.spawn())
             else:
                 self.stop_spawning = True
 
-        return command_queue
-
 # =============================================================================
 class gather_passive(strategy):
-    def __init__(self, game):
-        self.MAX_SHIPS = calc_max_ships(game)
-        self.gs = []
-        self.ds = []
+    def __init__(self, game, grid):
+        self.MAX_SHIPS = calc_max_ships(game, grid)
+        self.fleet = Fleet()
         self.stop_spawning = False
+        self.planner = ReservationPlanner(grid.width, grid.height, grid.dist)
         
-    def update(self, game):
+    def update(self, game, grid, budget, command_queue):
         # You extract player metadata and the updated map metadata here for convenience.
         me = game.me
         game_map = game.game_map
         
-        # A command queue holds all the commands you will run this turn. You build this list up and submit it at the
-        #   end of the turn.
-        command_queue = []
+        # The command queue belongs to the director. Commands are appended as they are built so the ones
+        #   made before a hard deadline still go out.
 
-        # look for ships to add
-        for s in me.get_ships():
-            if s.id not in [x.id for x in self.gs] and s.id not in [y.id for y in self.ds]:
-                self.gs.append(gatherer(s.id))
-        # logging.info("ADDED SHIPS")
+        # drop sunk ships, new ships start out gathering
+        fleet = self.fleet
+        fleet.reconcile(me.get_ships(), lambda s: gatherer(s.id))
         
-        # look for ships to remove
-        for g in self.gs:
-            if not me.has_ship(g.id):
-                self.gs.remove(g)
+        # if we have idle destroyers, convert them to gatherers
+        for d in fleet.of(destroyer, lambda d: d.idle):
+            fleet.assign(gatherer(d.id))
+        profiler.lap("fleet")
                 
-        for d in self.ds:
-            if not me.has_ship(d.id):
-                self.ds.remove(d)
-            elif d.idle:
-                # if we have idle destroyers, convert them to gatherers
-                idle_id = d.id
-                self.ds.remove(d)
-                self.gs.append(gatherer(idle_id))
-        # logging.info("REMOVING SHIPS")
-                
-        # give seekers new targets/paths
-        seekless = [x for x in self.gs if x.seek_pos is None]
-        if seekless:
-            assign_targets(game, seekless)
-            for seekship in seekless:
-                seekship.seek_path = get_path(game, me.get_ship(seekship.id).position, seekship.seek_pos)
-        # logging.info("UPDATED SEEK LOCATIONS SHIPS")
+        # give seekers new targets
+        seekless = fleet.of(gatherer, lambda g: g.seek_pos is None)
+        if seekless and not budget.expired():
+            assign_targets(game, grid, seekless)
+            profiler.lap("assign")
         
-        # look for enemy ships that are too close to our shipyard and destroy them
-        my_ship_ids = [s.id for s in me.get_ships()]
-        logging.info("My ship ids: {}".format(my_ship_ids))
-        for i in range(-2, 3):
-            for j in range(-2, 3):
-                map_pos = me.shipyard.position.directional_offset((i,j))
-                if game_map[map_pos].is_occupied:
-                    enemy_id = game_map[map_pos].ship.id
-                    if enemy_id not in my_ship_ids and enemy_id not in [x.target_id for x in self.ds]:
-                        # find the closest available ship and make it a destroyer
-                        ship_ids = [g.id for g in self.gs if g.state == gatherer.state.SEEK]
-                        ship_list = [s for s in me.get_ships() if s.id in ship_ids]
-                        s_id = get_closest_ship(game, map_pos, ship_list)
-                        
-                        if s_id:
-                            logging.info("Closest ship id: {} to target {} at ({}, {})".format(s_id, enemy_id, i, j))
-                            for g in self.gs:
-                                if g.id == s_id:
-                                    self.gs.remove(g)
-                                    break
-                            self.ds.append(destroyer(s_id, enemy_id))
-                        else:
-                            logging.info("Have to use a gathering/returning ship to defend :(")
-                            ship_ids = [g.id for g in self.gs]
-                            ship_list = [s for s in me.get_ships() if s.id in ship_ids]
-                            s_id = get_closest_ship(game, map_pos, ship_list)
-                            if s_id:
-                                for g in self.gs:
-                                    if g.id == s_id:
-                                        self.gs.remove(g)
-                                        break
-                                self.ds.append(destroyer(s_id, enemy_id))
-                            else:
-                                logging.info("we're done for")
-                        
-                        
-        logging.info("Gatherers: {}".format([x.id for x in self.gs]))
-        logging.info("Destroyers: {}".format([x.id for x in self.ds]))
-        # update ships
-        for g in self.gs:
-            if me.has_ship(g.id):
-                g_ship = me.get_ship(g.id)
-                command_queue.append(g.update(g_ship, game))
-            else:
-                logging.info("Warning: missing ship in gatherers")
-            
-        for d in self.ds:
-            if me.has_ship(d.id):
-                d_ship = me.get_ship(d.id)
-                command_queue.append(d.update(d_ship, game))
-            else:
-                logging.info("Warning: missing ship in destroyers")
+        self.plan_seekers(game, grid, budget)
+        profiler.lap("paths")
+        
+        # look for enemy ships that are too close to our shipyard and destroy them.
+        # the threat map says if any are near, most turns the box isn't scanned
+        yard = me.shipyard.position
+        if grid.threat.distance(yard) <= 2 * THREAT_OFFSETS.max():
+            self.defend(game, grid, budget, yard)
+                
+        profiler.lap("threats")
+        if LOG.HOT:
+            logging.info("Gatherers: {}".format([x.id for x in fleet.of(gatherer)]))
+            logging.info("Destroyers: {}".format([x.id for x in fleet.of(destroyer)]))
+        # update ships, every role has a live ship after reconcile
+        for role in fleet.of(gatherer) + fleet.of(destroyer):
+            if budget.expired():
+                break
+            with atomic():
+                command_queue.append(role.update(me.get_ship(role.id), game, grid))
+            profiler.count("ships_updated")
         # logging.info("UPDATED SHIPS")
+        profiler.lap("roles")
                 
         # If the game is in the first 200 turns and you have enough halite, spawn a ship.
         # Don't spawn a ship if you currently have a ship at port, though - the ships will collide.
         if game.turn_number <= (constants.MAX_TURNS - GAP.BUILD_FREEZE) and me.halite_amount >= constants.SHIP_COST and not game_map[me.shipyard].is_occupied and len(me.get_ships()) < self.MAX_SHIPS and not self.stop_spawning:
-            if (get_total_halite(game) > 50000):
+            if (get_total_halite(grid) > 50000):
                 command_queue.append(me.shipyard.spawn())
             else:
                 self.stop_spawning = True
+        profiler.lap("spawn")
 
-        return command_queue
+    def defend(self, game, grid, budget, yard):
+        # turn the closest gatherer into a destroyer for every enemy ship in
+        # the box around our shipyard
+        me = game.me
+        fleet = self.fleet
+        targeted = {d.target_id for d in fleet.of(destroyer)}
+        window = np.ix_((yard.y + THREAT_OFFSETS) % grid.height, (yard.x + THREAT_OFFSETS) % grid.width)
+        owners = grid.owner[window]
+        ids = grid.ship_at[window]
+        seeking = lambda g: g.state == gatherer.state.SEEK
+        
+        # scanned a column (x offset) at a time
+        for x, y in zip(*np.nonzero(((owners >= 0) & (owners != me.id)).T)):
+            if budget.expired():
+                break
+            enemy_id = int(ids[y, x])
+            if enemy_id in targeted:
+                continue
+                
+            # find the closest available ship and make it a destroyer
+            i, j = int(THREAT_OFFSETS[x]), int(THREAT_OFFSETS[y])
+            map_pos = yard.directional_offset((i, j))
+            s_id = get_closest_ship(grid, map_pos, lambda id: fleet.is_role(id, gatherer, seeking))
+            
+            if s_id is not None:
+                logging.info("Closest ship id: {} to target {} at ({}, {})".format(s_id, enemy_id, i, j))
+            else:
+                logging.info("Have to use a gathering/returning ship to defend :(")
+                s_id = get_closest_ship(grid, map_pos, lambda id: fleet.is_role(id, gatherer))
+                
+            if s_id is not None:
+                fleet.assign(destroyer(s_id, enemy_id))
+                targeted.add(enemy_id)
+            else:
+                logging.info("we're done for")
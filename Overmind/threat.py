@@ -0,0 +1,74 @@
+# Python 3.6
+
+import hlt
+
+from hlt import constants
+
+import numpy as np
+
+# =============================================================================
+# ThreatMap - where the enemy ships are, as [y, x] layers for the whole map
+#
+#   density   enemy ships within the inspiration radius of every cell
+#   cargo     halite those ships carry
+#   inspired  cells where one of our ships would be inspired
+#   nearest   manhattan steps to the closest enemy ship
+#
+# density and cargo are one convolution of the enemy layers with the radius
+# diamond, done with an fft so it costs the same for any radius. nearest is
+# a distance transform, one pass of running minima per axis
+# =============================================================================
+class ThreatMap:
+    def __init__(self, dist, radius=None):
+        self.width = dist.width
+        self.height = dist.height
+        self.radius = constants.INSPIRATION_RADIUS if radius is None else radius
+
+        # manhattan_table is indexed by offset, so it is already a diamond
+        # centred on [0, 0]
+        self._kernel = np.fft.rfft2(dist.manhattan_table <= self.radius)
+        self.unreached = self.width * self.height
+
+        shape = (self.height, self.width)
+        self.density = np.zeros(shape, dtype=np.int32)
+        self.cargo = np.zeros(shape, dtype=np.int64)
+        self.inspired = np.zeros(shape, dtype=bool)
+        self.nearest = np.full(shape, self.unreached, dtype=np.int64)
+        self._nearest = self.nearest.tolist()
+
+    def update(self, grid):
+        enemy = grid.occupied & (grid.owner != grid.my_id)
+        cargo = np.zeros(enemy.shape, dtype=np.int64)
+        cargo[enemy] = grid.ship_cargo[grid.ship_at[enemy]]
+
+        spread = np.fft.irfft2(np.fft.rfft2(np.stack([enemy, cargo])) * self._kernel, s=enemy.shape)
+        self.density = np.rint(spread[0]).astype(np.int32)
+        self.cargo = np.rint(spread[1]).astype(np.int64)
+        self.inspired = self.density >= constants.INSPIRATION_SHIP_COUNT
+        if not constants.INSPIRATION_ENABLED:
+            self.inspired.fill(False)
+
+        # manhattan distance splits into a pass along x and then along y
+        nearest = np.where(enemy, 0, self.unreached)
+        self.nearest = np.minimum(_spread(_spread(nearest, 1), 0), self.unreached)
+        self._nearest = self.nearest.tolist()
+
+    def distance(self, pos):
+        # steps from pos to the closest enemy ship, width*height if there are none
+        return self._nearest[pos.y % self.height][pos.x % self.width]
+
+# =============================================================================
+# _spread - min over j of f[j] + |i - j| along one axis of the torus
+#
+# the axis is tiled three times so every wrapped source is a plain one,
+# then min(f[j] - j) + i covers the sources before i and min(f[j] + j) - i
+# the ones after
+# =============================================================================
+def _spread(f, axis):
+    n = f.shape[axis]
+    tiled = np.concatenate([f, f, f], axis=axis)
+    idx = np.arange(3*n).reshape((-1, 1) if axis == 0 else (1, -1))
+
+    before = np.minimum.accumulate(tiled - idx, axis=axis) + idx
+    after = np.flip(np.minimum.accumulate(np.flip(tiled + idx, axis), axis=axis), axis) - idx
+    return np.take(np.minimum(before, after), np.arange(n, 2*n), axis=axis)
@@ -6,204 +6,187 @@ from hlt import constants
 from hlt.positionals import Direction
 
 from Overmind.ga_param import Params as GAP
+from Overmind.assign import hungarian, peaks, top_columns
+from Overmind.perf import profiler
+import Overmind.log as LOG
 
+import heapq
 import logging
-import math
+
+import numpy as np
+
+# no two targets from get_targets are within this many steps of each other
+TARGET_SPREAD = 3
+
+# nodes a get_path search expands before giving up. a path around a few
+# ships needs a small multiple of its length, more only goes to waste on a
+# goal that is walled in
+PATH_NODES = 1000
 
 # =============================================================================
-def get_total_halite(game):
-    halite = 0
-    for x in range(game.game_map.width):
-        for y in range(game.game_map.height):
-            p = hlt.Position(x, y)
-            halite += game.game_map[p].halite_amount
-            
-    return halite
+def get_total_halite(grid):
+    return grid.total_halite()
 
 # =============================================================================
-def calc_max_ships(game):
-    max_ships = int((GAP.MAX_SHIPS_X * game.game_map.width) + (GAP.MAX_SHIPS_Y / get_total_halite(game))/len(game.players))
+def calc_max_ships(game, grid):
+    max_ships = int((GAP.MAX_SHIPS_X * game.game_map.width) + (GAP.MAX_SHIPS_Y / get_total_halite(grid))/len(game.players))
     return max_ships
     
 # =============================================================================
 # get targets - find the places with the most concentrated halite on the map
 # =============================================================================
-def get_targets(game, n):
-    p_dist = list(range(-GAP.TARGET_SIZE, GAP.TARGET_SIZE+1))
-    map_values = {}
+def get_targets(game, grid, n, spread=TARGET_SPREAD):
+    # for every position add up the halite values of the surrounding cells
+    values = grid.window_sum(GAP.TARGET_SIZE)
+    profiler.count("cells_scored", values.size)
     
-    for x in range(game.game_map.width):
-        for y in range(game.game_map.height):
-            p = hlt.Position(x, y)
-            value = 0
-            
-            # for this position get the surrounding cells and add up the halite values
-            for dx in p_dist:
-                for dy in p_dist:
-                    temp_p = hlt.Position(x+dx, y+dy)
-                    p_n = game.game_map.normalize(temp_p)
-                    value += game.game_map[p_n].halite_amount
-            
-            dist = game.game_map.calculate_distance(game.me.shipyard.position, p)
-            max_dist = math.sqrt((game.game_map.width*game.game_map.width/4) + (game.game_map.height*game.game_map.height/4))
-            
-            d_value = 1 + ((dist / max_dist) * (GAP.DSCALE - 1))
-            
-            value = value / d_value
-
-            map_values[p] = value
-            
-    # sort map_values and return the best n positions
-    sorted_d = sorted(map_values.items(), key=lambda x: x[1], reverse=True)
+    dist = grid.dist.manhattan_from(game.me.shipyard.position)
+    d_value = 1 + ((dist / grid.dist.max_dist) * (GAP.DSCALE - 1))
     
-    targets = []
-    for i in range(n):
-        targets.append(sorted_d[i][0])
-
-    return targets
+    # return the best n positions
+    return grid.best_positions(values / d_value, n, spread)
 
 # =============================================================================
-def assign_targets(game, gs):
-    p_dist = list(range(-2, 3))
-    map_values = {}
+# assign targets - give every seekless ship its own target in one batch
+#
+# scores are the halite around each candidate scaled by the distance from each
+# ship, and the ships x candidates matrix is solved as an assignment problem
+# =============================================================================
+def assign_targets(game, grid, gs):
+    me = game.me
+    gs = [g for g in gs if me.has_ship(g.id)]
+    if not gs:
+        return
+        
+    ships = [me.get_ship(g.id) for g in gs]
+    sx = np.array([s.position.x for s in ships])
+    sy = np.array([s.position.y for s in ships])
     
-    for x in range(game.game_map.width):
-        for y in range(game.game_map.height):
-            p = hlt.Position(x, y)
-            value = 0
-            
-            # for this position get the surrounding cells and add up the halite values
-            for dx in p_dist:
-                for dy in p_dist:
-                    temp_p = hlt.Position(x+dx, y+dy)
-                    p_n = game.game_map.normalize(temp_p)
-                    value += game.game_map[p_n].halite_amount
-                    
-            map_values[p] = value
-            
-    # now scale the values for each ship we want to assign
-    max_dist = math.sqrt((game.game_map.width*game.game_map.width/4) + (game.game_map.height*game.game_map.height/4))
+    # only local maxima are candidates so ships don't pile onto one patch
+    with profiler.span("assign.candidates"):
+        values = grid.window_sum(2)
+        cells = peaks(values)
+        if len(cells) < len(gs):
+            cells = np.arange(grid.width * grid.height)
     
-    for g in gs:
-        if game.me.has_ship(g.id):
-            temp_map_vals = {}
-            for pos, val in map_values.items():
-                dist = game.game_map.calculate_distance(game.me.get_ship(g.id).position, pos)
-                d_value = 1 + ((dist / max_dist) * (GAP.DSCALE - 1))
-                temp_map_vals[pos] = val / d_value
-            
-            # now sort and assign
-            sorted_d = sorted(temp_map_vals.items(), key=lambda x: x[1], reverse=True)
-            g.seek_pos = sorted_d[0][0]
-            map_values.pop(g.seek_pos, None)
+    def score(cells):
+        cx = cells % grid.width
+        cy = cells // grid.width
+        dist = grid.dist.manhattan_table[(cy[None, :] - sy[:, None]) % grid.height, (cx[None, :] - sx[:, None]) % grid.width]
+        d_value = 1 + ((dist / grid.dist.max_dist) * (GAP.DSCALE - 1))
+        return values.ravel()[cells][None, :] / d_value
         
-# =============================================================================
-def get_dist(game, p1, p2):
-    w = game.game_map.width
-    h = game.game_map.height
+    profiler.count("cells_scored", len(cells) * len(gs))
+    with profiler.span("assign.score"):
+        cells = cells[top_columns(score(cells), len(gs))]
+        scores = score(cells)
+    with profiler.span("assign.match"):
+        cols = hungarian(scores)
     
-    dx = int(math.fabs(p1.x - p2.x))
-    if dx > w - dx:
-        dx = w - dx
-    
-    dy = int(math.fabs(p1.y - p2.y))
-    if dy > h - dy:
-        dy = h - dy
+    for g, c in zip(gs, cols):
+        g.seek_pos = grid.position(cells[c])
         
-    return math.sqrt((dx * dx) + (dy * dy))
+# =============================================================================
+def get_dist(grid, p1, p2):
+    return grid.dist.euclidean(p1, p2)
     
 # =============================================================================
 # A* pathfinding
+#
+# node state lives in dicts keyed by y*width + x and the heuristic is read
+# from the distance table as nodes are pushed, so a search only pays for the
+# cells it touches. the open set is a binary heap and max_nodes caps the
+# number of expanded nodes. with a turn budget the search also gives up once
+# the turn runs out of time. unsafe ignores every ship, crash only the one on
+# the goal
 # =============================================================================
-def get_path(game, p1, p2, unsafe=False):
+def get_path(game, grid, p1, p2, unsafe=False, max_nodes=PATH_NODES, budget=None, crash=False):
+    game_map = game.game_map
+    w = game_map.width
+    h = game_map.height
     
-    class Node:
-        def __init__(self, pos):
-            self.previous = None
-            self.h = None
-            self.cost = 0
-            self.p = pos
-            
     if p1 == p2:
         return None
     
-    if not unsafe and game.game_map[p2].is_occupied:
+    if not unsafe and not crash and game_map[p2].is_occupied:
         return None
         
-    start_node = Node(p1)
-    evaluated_nodes = []
-    leaf_nodes = []
+    p1 = game_map.normalize(p1)
+    p2 = game_map.normalize(p2)
+    start = p1.y * w + p1.x
+    goal = p2.y * w + p2.x
     
-    head_node = start_node
-    max_iter = game.game_map.width * 3
-    iter = 0
-    while True:
-        # get new leaf nodes
-        new_leaf_positions = head_node.p.get_surrounding_cardinals()
-        new_leaf_positions = [x for x in new_leaf_positions if x not in [n.p for n in evaluated_nodes]]
-        if unsafe:
-            for n in new_leaf_positions:
-                if n == p2:
-                    new_leaf_positions = [p2]
-        else:
-            new_leaf_positions = [x for x in new_leaf_positions if not game.game_map[x].is_occupied]
-        
-        # new_leaf_positions = [x for x in head_node.p.get_surrounding_cardinals() if not game.game_map[x].is_occupied and x not in evaluated_nodes]
-        
-        # evaluate leaf nodes
-        for pos in new_leaf_positions:
-            nn = Node(pos)
-            nn.previous = head_node
-            nn.cost = head_node.cost + 1
+    # distance to the goal, read as the heuristic
+    manhattan = grid.dist._manhattan
+    gx = p2.x
+    gy = p2.y
+    
+    cells = game_map._cells
+    cost = {start: 0}
+    previous = {}
+    closed = set()
+    
+    leaf_nodes = [(manhattan[(gy - p1.y) % h][(gx - p1.x) % w], 0, start)]
+    expanded = 0
+    while leaf_nodes:
+        _, _, node = heapq.heappop(leaf_nodes)
+        if node in closed:
+            continue
             
-            if pos == p2:
-                # found a path, generate a list of positions and return items
+        if node == goal:
+            # found a path, walk back to the start
+            profiler.count("astar_expanded", expanded)
+            if LOG.HOT:
                 logging.info("Path found!")
-                path = [pos]
-                p_node = nn.previous
-                while True:
-                    if p_node.previous is None:
-                        return path[::-1]
-                        
-                    path.append(p_node.p)
-                    p_node = p_node.previous
-            else:
-                nn.h = get_dist(game, nn.p, p2)
-                leaf_nodes.append(nn)
-                evaluated_nodes.append(nn)
-        
-        # update head node
-        if not leaf_nodes:
-            # no new nodes, return failure
+            path = []
+            while node != start:
+                path.append(hlt.Position(node % w, node // w))
+                node = previous[node]
+            return path[::-1]
+            
+        closed.add(node)
+        expanded += 1
+        if expanded > max_nodes:
+            profiler.count("astar_expanded", expanded)
+            logging.info("Path search from {} to {} ran out of nodes".format(p1, p2))
             return None
-        else:
-            leaf_nodes.sort(key=lambda node: node.cost + node.h)
-            head_node = leaf_nodes.pop(0)
-        
-        iter += 1
-        if iter > max_iter:
+        if budget is not None and expanded % 64 == 0 and budget.expired():
+            profiler.count("astar_expanded", expanded)
             return None
+        
+        x = node % w
+        y = node // w
+        node_cost = cost[node] + 1
+        for nx, ny in (((x + 1) % w, y), ((x - 1) % w, y), (x, (y + 1) % h), (x, (y - 1) % h)):
+            n = ny * w + nx
+            # closed nodes are skipped here too, the heuristic is consistent
+            # so their cost is never beaten
+            if cost.get(n, node_cost + 1) <= node_cost:
+                continue
+            if not unsafe and cells[ny][nx].is_occupied and n != goal:
+                continue
+                
+            cost[n] = node_cost
+            previous[n] = node
+            # prefer deeper nodes on ties, they are closer to the goal
+            heapq.heappush(leaf_nodes, (node_cost + manhattan[(gy - ny) % h][(gx - nx) % w], -node_cost, n))
+    
+    # no new nodes, return failure
+    profiler.count("astar_expanded", expanded)
+    return None
 
 # =============================================================================            
-def get_closest_ship(game, pos, ship_list):
-    s_id = None
-    
-    dist = 1000
-    for shp in ship_list:
-        temp_dist = get_dist(game, pos, shp.position)
-        if temp_dist < dist:
-            dist = temp_dist
-            s_id = shp.id
-    
-    return s_id
+def get_closest_ship(grid, pos, where=None, owner=None):
+    # id of the ship nearest pos that passes where(id), None if there isn't one
+    closest = grid.ships.nearest(pos, 1, where, owner, metric="euclidean")
+    return closest[0] if closest else None
     
 # =============================================================================            
-def get_ship_from_id(game, id):
-    s = None
-    for p_id in game.players:
-        if game.players[p_id].has_ship(id):
-            s = game.players[p_id].get_ship(id)
-            break
-            
-    return s
+def get_ship_from_id(game, grid, id):
+    # any player's ship, found through the grid's ship index
+    owner = grid.ship_owner_of(id)
+    if owner < 0:
+        return None
+        
+    return game.players[owner].get_ship(id)
     
\ No newline at end of file
@@ -0,0 +1,25 @@
+# Python 3.6
+
+import numpy as np
+
+# =============================================================================
+# window_sum - toroidal box sums from a wrap padded summed area table
+#
+# returns an array the shape of a where each cell holds the sum of the
+# (2r+1)^2 box centred on it. cost is O(W*H) regardless of the radius. the
+# box runs over the last two axes, so a stack of maps is summed in one go
+# =============================================================================
+def window_sum(a, radius):
+    lead = a.shape[:-2]
+    h, w = a.shape[-2:]
+    k = 2*radius + 1
+
+    pad = [(0, 0)] * len(lead) + [(radius, radius)] * 2
+    padded = np.pad(a.astype(np.int64), pad, mode="wrap")
+
+    # integral image with a leading row and column of zeros
+    sat = np.zeros(lead + (h + k, w + k), dtype=np.int64)
+    np.cumsum(padded, axis=-2, out=sat[..., 1:, 1:])
+    np.cumsum(sat[..., 1:, 1:], axis=-1, out=sat[..., 1:, 1:])
+
+    return sat[..., k:, k:] - sat[..., :h, k:] - sat[..., k:, :w] + sat[..., :h, :w]
@@ -0,0 +1,26 @@
+# Python 3.6
+
+import pytest
+
+# the engine constants of a 32x32 game, hlt.Game() would read these from the
+# engine. only the tests that need hlt ask for them, so the rest still run
+# without the kit installed
+CONSTANTS = {
+    "NEW_ENTITY_ENERGY_COST": 1000,
+    "DROPOFF_COST": 4000,
+    "MAX_ENERGY": 1000,
+    "MAX_TURNS": 400,
+    "EXTRACT_RATIO": 4,
+    "MOVE_COST_RATIO": 10,
+    "INSPIRATION_ENABLED": True,
+    "INSPIRATION_RADIUS": 4,
+    "INSPIRATION_SHIP_COUNT": 2,
+    "INSPIRED_EXTRACT_RATIO": 4,
+    "INSPIRED_BONUS_MULTIPLIER": 2.0,
+    "INSPIRED_MOVE_COST_RATIO": 10,
+}
+
+@pytest.fixture
+def engine_constants():
+    hlt = pytest.importorskip("hlt")
+    hlt.constants.load_constants(CONSTANTS)
@@ -0,0 +1,49 @@
+# Python 3.6
+
+import itertools
+
+import numpy as np
+import pytest
+
+from Overmind.assign import hungarian, peaks, top_columns
+
+# =============================================================================
+def best_total(scores):
+    # every way of giving the rows distinct columns
+    n, m = scores.shape
+    return max(scores[np.arange(n), list(cols)].sum() for cols in itertools.permutations(range(m), n))
+
+# =============================================================================
+@pytest.mark.parametrize("seed", range(200))
+def test_hungarian_matches_brute_force(seed):
+    rng = np.random.RandomState(seed)
+    n = int(rng.randint(1, 6))
+    m = int(rng.randint(n, 8))
+    # small integers give plenty of ties
+    scores = rng.randint(0, 6, (n, m)).astype(float) if seed % 2 else rng.rand(n, m) * 100
+
+    cols = hungarian(scores)
+
+    assert len(set(cols.tolist())) == n
+    assert scores[np.arange(n), cols].sum() == pytest.approx(best_total(scores))
+
+@pytest.mark.parametrize("seed", range(50))
+def test_top_columns_keep_the_optimum(seed):
+    rng = np.random.RandomState(seed)
+    n = int(rng.randint(1, 5))
+    scores = rng.rand(n, int(rng.randint(n, 9)))
+
+    kept = top_columns(scores, n)
+
+    assert best_total(scores[:, kept]) == pytest.approx(best_total(scores))
+
+@pytest.mark.parametrize("seed", range(20))
+def test_peaks_are_no_lower_than_their_neighbours(seed):
+    rng = np.random.RandomState(seed)
+    h, w = rng.randint(3, 9, 2)
+    values = rng.randint(0, 4, (h, w))
+
+    expected = [y * w + x for y in range(h) for x in range(w)
+                if all(values[y, x] >= values[(y + dy) % h, (x + dx) % w] for dy in (-1, 0, 1) for dx in (-1, 0, 1))]
+
+    assert peaks(values).tolist() == expected
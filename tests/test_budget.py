@@ -0,0 +1,45 @@
+# Python 3.6
+
+import signal
+import threading
+import time
+
+import pytest
+
+from Overmind.budget import TurnBudget, TurnTimeout, atomic
+
+needs_alarm = pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="no interval timers")
+
+# =============================================================================
+@needs_alarm
+def test_hard_stop_interrupts():
+    budget = TurnBudget(limit=0.02, margin=0)
+    with pytest.raises(TurnTimeout):
+        with budget.hard_stop():
+            time.sleep(1)
+
+@needs_alarm
+def test_hard_stop_waits_for_atomic_blocks():
+    budget = TurnBudget(limit=0.02, margin=0)
+    done = []
+    with pytest.raises(TurnTimeout):
+        with budget.hard_stop():
+            with atomic():
+                time.sleep(0.1)
+                done.append(1)
+            done.append(2)
+    assert done == [1]
+
+def test_hard_stop_off_the_main_thread():
+    budget = TurnBudget(limit=0.02, margin=0)
+    errors = []
+    def run():
+        try:
+            with budget.hard_stop():
+                time.sleep(0.05)
+        except Exception as e:
+            errors.append(e)
+    t = threading.Thread(target=run)
+    t.start()
+    t.join()
+    assert errors == []
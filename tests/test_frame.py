@@ -0,0 +1,99 @@
+# Python 3.6
+
+import io
+import sys
+
+import pytest
+
+hlt = pytest.importorskip("hlt")
+
+import numpy as np
+
+from Arena.referee import Referee
+from Overmind.frame import FrameReader
+
+# =============================================================================
+class ChunkedStream:
+    # hands out what has been fed so far a few bytes at a time, like a pipe
+    def __init__(self, chunk):
+        self.chunk = chunk
+        self.data = b""
+
+    def feed(self, data):
+        self.data += data
+
+    def read1(self, n):
+        out, self.data = self.data[:min(n, self.chunk)], self.data[min(n, self.chunk):]
+        return out
+
+def start_game(monkeypatch, data):
+    monkeypatch.setattr(sys, "stdin", io.StringIO(data.decode()))
+    return hlt.Game()
+
+def random_commands(rng, match):
+    # spawns, moves and constructs so frames carry every kind of record
+    commands = {}
+    for p in match.players:
+        cmds = ["g"] if rng.rand() < 0.5 else []
+        for id, (owner, _, _, _) in match.ships.items():
+            if owner != p.id:
+                continue
+            if rng.rand() < 0.02:
+                cmds.append("c {}".format(id))
+            else:
+                cmds.append("m {} {}".format(id, "nsewo"[rng.randint(5)]))
+        commands[p.id] = cmds
+    return commands
+
+def state(game):
+    players = {}
+    for player in game.players.values():
+        ships = {s.id: (s.position.x, s.position.y, s.halite_amount) for s in player.get_ships()}
+        dropoffs = {d.id: (d.position.x, d.position.y) for d in player.get_dropoffs()}
+        players[player.id] = (player.halite_amount, ships, dropoffs)
+    cells = [
+        [(cell.halite_amount, cell.ship and cell.ship.id, cell.structure and cell.structure.id) for cell in row]
+        for row in game.game_map._cells
+    ]
+    return game.turn_number, players, cells
+
+# =============================================================================
+@pytest.mark.parametrize("seed", range(3))
+def test_frames_match_hlt(monkeypatch, tmp_path, seed):
+    # hlt.Game() opens its log in the working directory
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.RandomState(seed)
+    referee = Referee(["Gatherer"] * (2 + 2*(seed % 2)), size=16, seed=seed, turns=40)
+    match = referee.match
+    init = referee.init_frame(0)
+    # enough halite to keep spawning and to build dropoffs
+    for p in match.players:
+        p.halite = 50000
+
+    frames = []
+    for turn in range(1, match.turns + 1):
+        match.turn = turn
+        frames.append(referee.turn_frame())
+        match.step(random_commands(rng, match))
+
+    game = start_game(monkeypatch, init)
+    # hlt reads the rest of its frames from this stdin
+    expected = start_game(monkeypatch, init + b"".join(frames))
+    stream = ChunkedStream(97)
+    reader = FrameReader(game, stream)
+    for frame in frames:
+        expected.update_frame()
+        stream.feed(frame)
+        reader.update_frame()
+        assert state(game) == state(expected)
+        assert stream.data == b""
+
+def test_bytes_after_a_frame_are_an_error(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    referee = Referee(["Gatherer", "Gatherer"], size=16, turns=5)
+    game = start_game(monkeypatch, referee.init_frame(0))
+    stream = ChunkedStream(1 << 16)
+    referee.match.turn = 1
+    stream.feed(referee.turn_frame() + referee.turn_frame())
+    with pytest.raises(SystemExit):
+        FrameReader(game, stream).read()
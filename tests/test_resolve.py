@@ -0,0 +1,142 @@
+# Python 3.6
+
+import pytest
+
+hlt = pytest.importorskip("hlt")
+
+from hlt import constants
+from hlt.entity import Dropoff, Ship, Shipyard
+from hlt.game_map import GameMap, MapCell
+from hlt.player import Player
+from hlt.positionals import Position
+
+import collections
+import types
+
+import numpy as np
+
+from Overmind.resolve import OFFSETS, resolve
+
+# =============================================================================
+# random_turn - a crowded board of our ships with random commands
+#
+# small maps so chains, swaps and cycles are common. cells and cargo are
+# random too, so some ships can't pay to move. some ships have a goal to
+# reroute toward and a few enemy ships sit on the free cells
+# =============================================================================
+def random_turn(rng, size, n_ships):
+    cells = [[MapCell(Position(x, y), int(rng.randint(0, 1000))) for x in range(size)] for y in range(size)]
+    game_map = GameMap(cells, size, size)
+
+    free = rng.permutation(size * size)
+    yard = Position(int(free[0] % size), int(free[0] // size))
+    me = Player(0, Shipyard(0, -1, yard))
+    if rng.rand() < 0.5:
+        me._dropoffs[0] = Dropoff(0, 0, Position(int(free[1] % size), int(free[1] // size)))
+
+    # ships may start on our structures, that's where the pile ups happen
+    for id, cell in enumerate(rng.choice(size * size, n_ships, replace=False)):
+        ship = Ship(0, id, Position(int(cell % size), int(cell // size)), int(rng.randint(0, 200)))
+        me._ships[id] = ship
+        game_map[ship.position].mark_unsafe(ship)
+
+    enemies = []
+    for id, cell in enumerate(free[-int(rng.randint(0, 3)):] if size > 3 else []):
+        ship = Ship(1, 1000 + id, Position(int(cell % size), int(cell // size)), 0)
+        if game_map[ship.position].ship is None:
+            game_map[ship.position].mark_unsafe(ship)
+            enemies.append(ship)
+
+    commands = []
+    for ship in me.get_ships():
+        roll = rng.rand()
+        if roll < 0.05:
+            continue
+        elif roll < 0.08:
+            commands.append("c {}".format(ship.id))
+        else:
+            commands.append("m {} {}".format(ship.id, rng.choice(list(OFFSETS))))
+    rng.shuffle(commands)
+    if rng.rand() < 0.5:
+        commands.append("g")
+
+    crashers = {s.id for s in me.get_ships() if rng.rand() < 0.2}
+    goals = {s.id: Position(int(rng.randint(0, size)), int(rng.randint(0, size))) for s in me.get_ships() if rng.rand() < 0.7}
+    return types.SimpleNamespace(me=me, game_map=game_map), commands, crashers, goals
+
+def end_cells(game, commands):
+    # where every remaining ship ends the turn under the engine's rules
+    size = game.game_map.width
+    ends = {}
+    for cmd in commands:
+        parts = cmd.split()
+        if parts[0] != "m":
+            continue
+        ship = game.me.get_ship(int(parts[1]))
+        dx, dy = OFFSETS[parts[2]]
+        if game.game_map[ship.position].halite_amount // constants.MOVE_COST_RATIO > ship.halite_amount:
+            dx = dy = 0
+        ends[ship.id] = ((ship.position.x + dx) % size, (ship.position.y + dy) % size)
+    return ends
+
+# =============================================================================
+@pytest.mark.parametrize("seed", range(300))
+def test_no_two_ships_end_on_one_cell(seed, engine_constants):
+    rng = np.random.RandomState(seed)
+    size = int(rng.randint(3, 9))
+    game, commands, crashers, goals = random_turn(rng, size, int(rng.randint(1, size * size + 1)))
+    may_crash = crashers.__contains__ if rng.rand() < 0.5 else None
+    goal = goals.get if rng.rand() < 0.7 else None
+    me = game.me
+    game_map = game.game_map
+
+    result = resolve(game, commands, may_crash, goal)
+
+    # every ship keeps its command, is held or takes another move toward its
+    # goal, one command each
+    leaving = {int(c.split()[1]) for c in commands if c.startswith("c ")}
+    rerouted = {}
+    for cmd in result:
+        if cmd.startswith("m "):
+            ship = me.get_ship(int(cmd.split()[1]))
+            if cmd not in commands and cmd != ship.stay_still():
+                assert goal is not None and ship.id in goals
+                assert OFFSETS[cmd.split()[2]] in game_map.get_unsafe_moves(ship.position, goals[ship.id])
+                assert any(c.startswith("m {} ".format(ship.id)) and c != ship.stay_still() for c in commands)
+                rerouted[ship.id] = cmd
+    assert [c for c in result if c.startswith("c ")] == [c for c in commands if c.startswith("c ")]
+    ends = end_cells(game, result)
+    assert len(ends) == len([c for c in result if c.startswith("m ")])
+    assert set(ends) == {s.id for s in me.get_ships()} - leaving
+
+    home = {(me.shipyard.position.x, me.shipyard.position.y)}
+    home.update((d.position.x, d.position.y) for d in me.get_dropoffs())
+    cells = collections.defaultdict(list)
+    for id, cell in ends.items():
+        cells[cell].append(id)
+    for cell, ids in cells.items():
+        if len(ids) > 1:
+            # only piling onto our own structure on purpose
+            assert cell in home
+            assert may_crash is not None
+            assert sum(1 for id in ids if not may_crash(id)) <= 1
+
+    # a spawn only goes out onto an empty shipyard
+    if "g" in result:
+        assert (me.shipyard.position.x, me.shipyard.position.y) not in cells
+
+    # a ship only gives up the cell it wanted when it really is taken, and
+    # only stays when every other move toward its goal is taken too
+    wanted = end_cells(game, commands)
+    for id, cell in ends.items():
+        if id in wanted and wanted[id] != cell:
+            assert wanted[id] in cells
+        ship = me.get_ship(id)
+        if id in rerouted:
+            enemy = game_map[ship.position.directional_offset(OFFSETS[rerouted[id].split()[2]])].ship
+            assert enemy is None or enemy.owner == me.id
+        elif id in wanted and wanted[id] != cell and goal is not None and id in goals:
+            for d in game_map.get_unsafe_moves(ship.position, goals[id]):
+                p = game_map.normalize(ship.position.directional_offset(d))
+                other = game_map[p].ship
+                assert (p.x, p.y) in cells or (other is not None and other.owner != me.id)
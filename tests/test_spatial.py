@@ -0,0 +1,68 @@
+# Python 3.6
+
+import pytest
+
+hlt = pytest.importorskip("hlt")
+
+from hlt.positionals import Position
+
+import numpy as np
+
+from Overmind.distance import DistanceTable
+from Overmind.spatial import SpatialIndex
+
+# =============================================================================
+def random_index(rng):
+    w, h = rng.randint(3, 40, 2)
+    dist = DistanceTable(int(w), int(h))
+    index = SpatialIndex(dist, bucket=int(rng.randint(1, 10)))
+
+    n = int(rng.randint(0, 60))
+    owners = rng.randint(0, 4, n)
+    ids = rng.permutation(1000)[:n]
+    # ships may share a cell, the index doesn't care
+    xs = rng.randint(0, w, n)
+    ys = rng.randint(0, h, n)
+    index.build(owners, ids, xs, ys)
+    return dist, index, list(zip(owners.tolist(), ids.tolist(), xs.tolist(), ys.tolist()))
+
+def ranked(dist, ships, pos, where, owner, metric):
+    # (distance, build order, id) of every matching ship, the query's order
+    measure = dist.manhattan if metric == "manhattan" else dist.euclidean
+    found = []
+    for order, (o, id, x, y) in enumerate(ships):
+        if (owner is None or o == owner) and (where is None or where(id)):
+            found.append((measure(pos, Position(x, y)), order, id))
+    return sorted(found)
+
+def random_query(rng):
+    pos = Position(int(rng.randint(-50, 50)), int(rng.randint(-50, 50)))
+    where = (lambda id: id % 3 != 0) if rng.rand() < 0.5 else None
+    owner = int(rng.randint(0, 4)) if rng.rand() < 0.5 else None
+    metric = "manhattan" if rng.rand() < 0.5 else "euclidean"
+    return pos, where, owner, metric
+
+# =============================================================================
+@pytest.mark.parametrize("seed", range(200))
+def test_nearest_matches_brute_force(seed):
+    rng = np.random.RandomState(seed)
+    dist, index, ships = random_index(rng)
+
+    for _ in range(10):
+        pos, where, owner, metric = random_query(rng)
+        k = int(rng.randint(1, 8))
+        expected = [id for _, _, id in ranked(dist, ships, pos, where, owner, metric)[:k]]
+
+        assert index.nearest(pos, k, where, owner, metric) == expected
+
+@pytest.mark.parametrize("seed", range(200))
+def test_within_matches_brute_force(seed):
+    rng = np.random.RandomState(seed)
+    dist, index, ships = random_index(rng)
+
+    for _ in range(10):
+        pos, where, owner, metric = random_query(rng)
+        radius = float(rng.randint(0, 30)) + (0.5 if rng.rand() < 0.3 else 0)
+        expected = [id for d, _, id in ranked(dist, ships, pos, where, owner, metric) if d <= radius]
+
+        assert index.within(pos, radius, where, owner, metric) == expected
@@ -0,0 +1,72 @@
+# Python 3.6
+
+import pytest
+
+hlt = pytest.importorskip("hlt")
+
+from hlt import constants
+
+import types
+
+import numpy as np
+
+from Overmind.distance import DistanceTable
+from Overmind.threat import ThreatMap, _spread
+
+# =============================================================================
+def spread_brute_force(f, axis):
+    n = f.shape[axis]
+    out = np.empty_like(f)
+    for i in range(n):
+        d = np.minimum(np.abs(np.arange(n) - i), n - np.abs(np.arange(n) - i))
+        d = d.reshape((-1, 1) if axis == 0 else (1, -1))
+        out.swapaxes(0, axis)[i] = (f + d).min(axis=axis)
+    return out
+
+def random_grid(rng, w, h):
+    # the grid layers ThreatMap reads, player 0 is us
+    n = int(rng.randint(0, w * h // 3 + 1))
+    cells = rng.choice(w * h, n, replace=False)
+    grid = types.SimpleNamespace(
+        my_id=0,
+        occupied=np.zeros((h, w), dtype=bool),
+        owner=np.full((h, w), -1, dtype=np.int8),
+        ship_at=np.full((h, w), -1, dtype=np.int32),
+        ship_cargo=rng.randint(0, 1001, n),
+    )
+    grid.occupied.ravel()[cells] = True
+    grid.owner.ravel()[cells] = rng.randint(0, 4, n)
+    grid.ship_at.ravel()[cells] = np.arange(n)
+    return grid
+
+# =============================================================================
+@pytest.mark.parametrize("seed", range(100))
+def test_spread_matches_brute_force(seed):
+    rng = np.random.RandomState(seed)
+    h, w = rng.randint(1, 12, 2)
+    f = np.where(rng.rand(h, w) < 0.2, rng.randint(0, 20, (h, w)), 10**6)
+
+    for axis in (0, 1):
+        assert np.array_equal(_spread(f, axis), spread_brute_force(f, axis))
+
+@pytest.mark.parametrize("seed", range(50))
+def test_threat_layers_match_brute_force(seed, engine_constants):
+    rng = np.random.RandomState(seed)
+    w, h = (int(v) for v in rng.randint(3, 20, 2))
+    dist = DistanceTable(w, h)
+    grid = random_grid(rng, w, h)
+    radius = int(rng.randint(0, 6))
+
+    threat = ThreatMap(dist, radius)
+    threat.update(grid)
+
+    enemies = [(x, y, grid.ship_cargo[grid.ship_at[y, x]]) for y, x in zip(*np.nonzero(grid.occupied & (grid.owner != 0)))]
+    for y in range(h):
+        for x in range(w):
+            d = [dist._manhattan[(ey - y) % h][(ex - x) % w] for ex, ey, _ in enemies]
+            near = [c for (_, _, c), di in zip(enemies, d) if di <= radius]
+            assert threat.density[y, x] == len(near)
+            assert threat.cargo[y, x] == sum(near)
+            assert threat.inspired[y, x] == (len(near) >= constants.INSPIRATION_SHIP_COUNT)
+            assert threat.nearest[y, x] == min(d, default=w * h)
+            assert threat.distance(hlt.Position(x + w, y - h)) == threat.nearest[y, x]
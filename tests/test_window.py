@@ -0,0 +1,34 @@
+# Python 3.6
+
+import numpy as np
+import pytest
+
+from Overmind.window import window_sum
+
+# =============================================================================
+def brute_force(a, radius):
+    h, w = a.shape[-2:]
+    out = np.zeros(a.shape, dtype=np.int64)
+    for y in range(h):
+        for x in range(w):
+            for dy in range(-radius, radius + 1):
+                for dx in range(-radius, radius + 1):
+                    out[..., y, x] += a[..., (y + dy) % h, (x + dx) % w]
+    return out
+
+# =============================================================================
+@pytest.mark.parametrize("seed", range(40))
+def test_window_sum_matches_brute_force(seed):
+    rng = np.random.RandomState(seed)
+    h, w = rng.randint(1, 10, 2)
+    # radius up to past the map size, the box then wraps onto itself
+    radius = int(rng.randint(0, 12))
+    a = rng.randint(0, 1001, (h, w)).astype(np.int32)
+
+    assert np.array_equal(window_sum(a, radius), brute_force(a, radius))
+
+def test_window_sum_over_a_stack():
+    rng = np.random.RandomState(0)
+    a = rng.randint(0, 1001, (3, 2, 6, 7))
+
+    assert np.array_equal(window_sum(a, 2), brute_force(a, 2))